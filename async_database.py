@@ -0,0 +1,115 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from database import HealthDatabase
+
+class DatabaseError(Exception):
+    """A database operation failed"""
+
+class DatabaseBusyError(DatabaseError):
+    """The database stayed locked past the busy timeout; the operation can be retried"""
+
+class DatabaseClosedError(DatabaseError):
+    """The async database has been closed"""
+
+class AsyncHealthDatabase:
+    """Asyncio facade over HealthDatabase with one writer thread and a pool of reader threads
+
+    Writes are serialized on a single thread, so they never contend with
+    each other for SQLite's write lock. Reads run on their own threads,
+    each with its own connection; under WAL they proceed while a write is
+    in progress instead of queueing behind it. At most max_pending
+    operations are in flight; further callers wait their turn. Failures
+    raise DatabaseError subclasses instead of being printed.
+    """
+
+    def __init__(self, database=None, readers=4, max_pending=256):
+        self.database = database or HealthDatabase()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader",
+                                           initializer=self._init_reader)
+        self.max_pending = max_pending
+        self._pending = None
+        self._closed = False
+
+    def _init_reader(self):
+        # Reader threads never write, so guard against it at the connection level
+        self.database.connection().execute('PRAGMA query_only = ON')
+
+    async def _run(self, executor, func, *args):
+        if self._closed:
+            raise DatabaseClosedError("Database is closed")
+        if self._pending is None:
+            self._pending = asyncio.Semaphore(self.max_pending)
+        async with self._pending:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(executor, func, *args)
+            except RuntimeError as e:
+                if self._closed:
+                    raise DatabaseClosedError("Database is closed") from e
+                raise
+            except sqlite3.OperationalError as e:
+                if 'locked' in str(e) or 'busy' in str(e):
+                    raise DatabaseBusyError(str(e)) from e
+                raise DatabaseError(str(e)) from e
+            except sqlite3.Error as e:
+                raise DatabaseError(str(e)) from e
+
+    def _read(self, func, *args):
+        return self._run(self._readers, func, *args)
+
+    def _write(self, func, *args):
+        return self._run(self._writer, func, *args)
+
+    # Writes
+
+    async def save_diagnosis(self, symptoms, diagnosis, confidence):
+        """Save a diagnosis; returns its row id"""
+        row = self.database.diagnosis_row(symptoms, diagnosis, confidence)
+        return await self._write(self.database._insert_diagnosis, row)
+
+    async def save_diagnoses(self, rows):
+        """Save prepared diagnosis_row() tuples in one transaction; returns how many"""
+        return await self._write(self.database._insert_diagnoses, list(rows))
+
+    # Reads
+
+    async def get_history_page(self, cursor=None, page_size=10, start=None, end=None, diagnosis=None):
+        """One page of history records plus the cursor for the next page (None at the end)"""
+        records = await self._read(self.database._fetch_history_page, cursor, page_size, start, end, diagnosis)
+        return records, records[-1].cursor if len(records) == page_size else None
+
+    async def get_diagnosis_history(self, limit=10):
+        """Recent history as (date, symptoms, diagnosis, confidence) tuples"""
+        records, _ = await self.get_history_page(page_size=limit)
+        return [record.as_tuple() for record in records]
+
+    async def get_recent_diagnoses(self, limit=3):
+        return await self._read(self.database._recent_diagnoses, limit)
+
+    async def get_database_stats(self, top_k=5):
+        return await self._read(self.database._database_stats, top_k)
+
+    async def get_tips_by_category(self, category):
+        return await self._read(self.database._tips_by_category, category)
+
+    async def search_tips(self, condition):
+        """Tips for a medical condition, best matches first"""
+        return await self._read(self.database._search_tips, condition)
+
+    async def get_all_tips(self):
+        return await self._read(self.database._all_tips)
+
+    def close(self):
+        """Finish queued operations and stop the worker threads"""
+        self._closed = True
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
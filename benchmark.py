@@ -0,0 +1,213 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from database import HealthDatabase
+from diagnostic_engine import DiagnosticEngine
+from health_tips import HealthTips
+from worker_pool import random_symptom_sets
+
+DEFAULT_ROWS = (1000, 10000, 100000)
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(q / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def measure(name, call, iterations=200, setup=None, memory_iterations=20):
+    """Time repeated calls; setup() runs before each call and is not timed
+
+    Latencies are taken without tracing; peak memory comes from a separate,
+    shorter pass under tracemalloc so its overhead doesn't skew the timings.
+    """
+    if setup:
+        setup()
+    call()  # warm up
+
+    latencies = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    total = sum(latencies)
+
+    tracemalloc.start()
+    try:
+        for _ in range(memory_iterations):
+            if setup:
+                setup()
+            tracemalloc.reset_peak()
+            call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'name': name,
+        'iterations': iterations,
+        'mean_ms': total / iterations * 1000,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': latencies[-1] * 1000,
+        'ops_per_sec': iterations / total if total else 0.0,
+        'peak_memory_bytes': peak,
+    }
+
+def populate(database, rows, engine, seed=0, chunk_size=50000):
+    """Fill the diagnoses table with reproducible synthetic cases spread over the past year"""
+    rng = random.Random(seed)
+    diagnoses = [name.replace('_', ' ').title() for name in engine.illnesses]
+    now = datetime.now(timezone.utc)
+    for start in range(0, rows, chunk_size):
+        count = min(chunk_size, rows - start)
+        chunk = []
+        for symptoms in random_symptom_sets(count, engine.all_symptoms, seed=seed + start):
+            created = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+            chunk.append((created.strftime("%Y-%m-%d %H:%M"), json.dumps(symptoms),
+                          rng.choice(diagnoses), rng.uniform(0.2, 0.95),
+                          created.strftime("%Y-%m-%d %H:%M:%S")))
+        if not database.save_diagnoses(chunk):
+            raise RuntimeError(f"Could not populate benchmark database at row {start}")
+
+def populate_tips(database, engine, per_condition=3):
+    """Add general, nutrition, mental health and per-illness tips"""
+    tips = [(category, f"{category.replace('_', ' ').title()} tip {i}", None)
+            for category in ('general', 'nutrition', 'mental_health') for i in range(10)]
+    tips += [('disease', f"Tip {i} for {name.replace('_', ' ')}", name)
+             for name in engine.illnesses for i in range(per_condition)]
+    with database.connection() as conn:
+        conn.executemany('INSERT INTO health_tips (category, tip_text, condition_related) VALUES (?, ?, ?)', tips)
+
+def bench_engine(engine, iterations, seed=0):
+    """Diagnosis paths; these don't depend on database size"""
+    workload = random_symptom_sets(iterations + 1, engine.all_symptoms, seed=seed)
+    cases = itertools.cycle(workload)
+    results = [
+        measure('analyze_symptoms', lambda: engine.analyze_symptoms(next(cases)), iterations,
+                setup=engine.result_cache.clear),
+        measure('analyze_symptoms_cached', lambda: engine.analyze_symptoms(workload[0]), iterations),
+    ]
+    batch = workload[:min(len(workload), 1000)]
+    result = measure('analyze_batch', lambda: engine.analyze_batch(batch, use_cache=False),
+                     max(1, iterations // 20), memory_iterations=3)
+    result['cases_per_sec'] = result['ops_per_sec'] * len(batch)
+    results.append(result)
+    return results
+
+def bench_database(rows, engine, iterations, seed=0, directory=None):
+    """Persistence and tips paths against a fresh database holding `rows` diagnoses"""
+    workdir = tempfile.mkdtemp(prefix='health-bench-', dir=directory)
+    path = os.path.join(workdir, 'bench.db')
+    database = HealthDatabase(path)
+    try:
+        start = time.perf_counter()
+        populate(database, rows, engine, seed)
+        populate_tips(database, engine)
+        populate_seconds = time.perf_counter() - start
+
+        tips = HealthTips(database)
+        recent = [name.replace('_', ' ').title() for name in list(engine.illnesses)[:3]]
+        symptoms = random_symptom_sets(1, engine.all_symptoms, seed=seed)[0]
+        # A page near the oldest rows: keyset pagination must cost the same at any depth
+        deep_cursor = database.connection().execute('''
+            SELECT created_at, id FROM diagnoses ORDER BY created_at, id LIMIT 1 OFFSET ?
+        ''', (min(20, max(0, rows - 1)),)).fetchone()
+        results = [
+            measure('save_diagnosis', lambda: database.save_diagnosis(symptoms, 'Flu', 0.5), iterations),
+            measure('get_diagnosis_history', lambda: database.get_diagnosis_history(10), iterations),
+            measure('get_history_page_deep', lambda: database.get_history_page(deep_cursor, 10), iterations),
+            measure('get_database_stats', database.get_database_stats, iterations),
+            measure('get_personalized_tips', lambda: tips.get_personalized_tips(recent), iterations,
+                    setup=tips.invalidate_cache),
+            measure('get_personalized_tips_cached', lambda: tips.get_personalized_tips(recent), iterations),
+        ]
+        return {
+            'rows': rows,
+            'populate_seconds': populate_seconds,
+            'populate_rows_per_sec': rows / populate_seconds if populate_seconds else 0.0,
+            'database_bytes': os.path.getsize(path),
+            'results': results,
+        }
+    finally:
+        database.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def run(row_counts=DEFAULT_ROWS, iterations=200, seed=0, directory=None):
+    """Run the whole suite and return the results as plain data"""
+    engine = DiagnosticEngine()
+    report = {
+        'created_at': datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sqlite': sqlite3.sqlite_version,
+        'seed': seed,
+        'iterations': iterations,
+        'engine': bench_engine(engine, iterations, seed),
+        'databases': [],
+    }
+    _print_results('engine', report['engine'])
+    for rows in row_counts:
+        result = bench_database(rows, engine, iterations, seed, directory)
+        report['databases'].append(result)
+        _print_results(f"{rows:,} rows (populated at {result['populate_rows_per_sec']:,.0f} rows/s)",
+                       result['results'])
+    return report
+
+def compare(report, baseline):
+    """Print p50 latency of this run relative to a baseline report"""
+    def index(data):
+        entries = {('engine', r['name']): r for r in data.get('engine', [])}
+        for db in data.get('databases', []):
+            entries.update({(db['rows'], r['name']): r for r in db['results']})
+        return entries
+
+    old = index(baseline)
+    print("\nChange in p50 latency vs baseline:")
+    for key, result in index(report).items():
+        if key in old and old[key]['p50_ms']:
+            ratio = result['p50_ms'] / old[key]['p50_ms']
+            print(f"  {str(key[0]):>10} {key[1]:<30} {old[key]['p50_ms']:9.3f} -> {result['p50_ms']:9.3f} ms ({ratio:.2f}x)")
+
+def _print_results(heading, results):
+    print(f"\n{heading}")
+    for r in results:
+        print(f"  {r['name']:<30} p50 {r['p50_ms']:9.3f} ms  p99 {r['p99_ms']:9.3f} ms  "
+              f"{r['ops_per_sec']:12,.0f} ops/s  peak {r['peak_memory_bytes'] / 1024:9,.1f} KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark of diagnosis, persistence and tips paths")
+    parser.add_argument('--rows', type=int, nargs='+', default=list(DEFAULT_ROWS),
+                        help="diagnosis row counts to benchmark against (e.g. 1000 100000 10000000)")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', metavar='BASELINE', help="earlier results file to compare against")
+    parser.add_argument('--tmp-dir', help="where to create the temporary databases")
+    args = parser.parse_args()
+
+    report = run(args.rows, args.iterations, args.seed, args.tmp_dir)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import argparse
+import csv
+import glob
+import json
+import os
+
+from database import HealthDatabase
+from symptom_bitset import SymptomBitset
+from knowledge_base import get_knowledge_base
+
+TABLE_COLUMNS = {
+    'diagnoses': ['id', 'date', 'symptoms', 'diagnosis', 'confidence', 'created_at'],
+    'health_tips': ['id', 'category', 'tip_text', 'condition_related'],
+}
+NUMERIC_COLUMNS = {'id': int, 'confidence': float}
+FORMATS = ('csv', 'jsonl', 'npz')
+
+def detect_format(path, fmt=None):
+    """Pick the file format from an explicit name or the path's extension"""
+    fmt = fmt or os.path.splitext(path.rstrip('/\\'))[1].lstrip('.').lower() or 'npz'
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}', expected one of {', '.join(FORMATS)}")
+    return fmt
+
+def iter_table_chunks(database, table, chunk_size=10000):
+    """Yield lists of rows in id order, reading one keyset chunk at a time"""
+    columns = _columns(table)
+    last_id = -1
+    while True:
+        rows = database.connection().execute(f'''
+            SELECT {', '.join(columns)} FROM {table}
+            WHERE id > ? ORDER BY id LIMIT ?
+        ''', (last_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+def export_table(database, table, path, fmt=None, chunk_size=10000):
+    """Stream a table to CSV, JSONL or a directory of columnar .npz parts; returns rows written"""
+    fmt = detect_format(path, fmt)
+    columns = _columns(table)
+    chunks = iter_table_chunks(database, table, chunk_size)
+    written = 0
+
+    if fmt == 'npz':
+        os.makedirs(path, exist_ok=True)
+        codec = _NpzCodec(table)
+        for part, rows in enumerate(chunks):
+            codec.write(os.path.join(path, f"part-{part:05d}.npz"), rows)
+            written += len(rows)
+        return written
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for rows in chunks:
+                writer.writerows(rows)
+                written += len(rows)
+        else:
+            for rows in chunks:
+                f.writelines(json.dumps(dict(zip(columns, row))) + '\n' for row in rows)
+                written += len(rows)
+    return written
+
+def import_table(database, table, path, fmt=None, chunk_size=10000, keep_ids=True, resume=True):
+    """Bulk-load an export into a table; returns rows imported by this call
+
+    Each chunk is inserted in one transaction together with its checkpoint
+    in import_checkpoints, so an interrupted import resumes exactly where
+    it stopped. With keep_ids, rows whose id already exists are skipped.
+    """
+    fmt = detect_format(path, fmt)
+    columns = _columns(table)
+    insert_columns = columns if keep_ids else columns[1:]
+    verb = 'INSERT OR IGNORE' if keep_ids else 'INSERT'
+    sql = (f"{verb} INTO {table} ({', '.join(insert_columns)}) "
+           f"VALUES ({', '.join('?' for _ in insert_columns)})")
+
+    source = f"{table}:{os.path.abspath(path)}"
+    done = _load_checkpoint(database, source) if resume else 0
+    imported = 0
+    for rows in _read_chunks(table, path, fmt, chunk_size, skip=done):
+        if not keep_ids:
+            rows = [row[1:] for row in rows]
+        done += len(rows)
+        with database.connection() as conn:
+            # rowcount leaves out rows INSERT OR IGNORE skipped; total_changes would
+            # also count the statistics and version triggers fired by each insert
+            inserted = conn.executemany(sql, rows).rowcount
+            conn.execute('''
+                INSERT INTO import_checkpoints (source, rows_done, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(source) DO UPDATE SET rows_done = excluded.rows_done,
+                                                  updated_at = excluded.updated_at
+            ''', (source, done))
+        imported += inserted
+    return imported
+
+def _columns(table):
+    try:
+        return TABLE_COLUMNS[table]
+    except KeyError:
+        raise ValueError(f"Unknown table '{table}'")
+
+def _load_checkpoint(database, source):
+    row = database.connection().execute(
+        'SELECT rows_done FROM import_checkpoints WHERE source = ?', (source,)
+    ).fetchone()
+    return row[0] if row else 0
+
+def _read_chunks(table, path, fmt, chunk_size, skip=0):
+    """Yield typed row tuples from an export in chunks, skipping the first `skip` rows"""
+    columns = _columns(table)
+    if fmt == 'npz':
+        codec = _NpzCodec(table)
+        for part_path in sorted(glob.glob(os.path.join(path, 'part-*.npz'))):
+            rows = codec.read(part_path)
+            if skip >= len(rows):
+                skip -= len(rows)
+                continue
+            rows, skip = rows[skip:], 0
+            for start in range(0, len(rows), chunk_size):
+                yield rows[start:start + chunk_size]
+        return
+
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            reader = csv.reader(f)
+            next(reader, None)
+            records = (_typed(columns, values, empty_is_null=True) for values in reader)
+        else:
+            records = (_typed(columns, [record.get(c) for c in columns])
+                       for record in (json.loads(line) for line in f if line.strip()))
+        chunk = []
+        for record in records:
+            if skip:
+                skip -= 1
+                continue
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+def _typed(columns, values, empty_is_null=False):
+    """Convert fields back to SQLite values (numbers parsed)
+
+    CSV can't tell NULL from an empty string, so CSV readers pass
+    empty_is_null to turn '' into NULL; JSON keeps "" and null apart.
+    """
+    row = []
+    for column, value in zip(columns, values):
+        if value is None or (empty_is_null and value == ''):
+            row.append(None)
+        elif column in NUMERIC_COLUMNS:
+            row.append(NUMERIC_COLUMNS[column](value))
+        else:
+            row.append(value)
+    return tuple(row)
+
+class _NpzCodec:
+    """Columnar .npz encoding; diagnosis symptoms are stored as bitmask words"""
+
+    def __init__(self, table):
+        self.table = table
+        self.columns = _columns(table)
+        self.bitset = get_knowledge_base().bitset
+
+    def write(self, path, rows):
+        import numpy as np
+        arrays = {}
+        for i, column in enumerate(self.columns):
+            values = [row[i] for row in rows]
+            if column == 'symptoms':
+                arrays.update(self._encode_symptoms(values))
+            elif column == 'id':
+                arrays[column] = np.array(values, dtype=np.int64)
+            elif column == 'confidence':
+                arrays[column] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                arrays[column] = np.array(['' if v is None else v for v in values], dtype=str)
+                arrays[f"{column}_null"] = np.array([v is None for v in values], dtype=bool)
+        if self.table == 'diagnoses':
+            arrays['vocabulary'] = np.array(self.bitset.vocabulary, dtype=str)
+        np.savez_compressed(path, **arrays)
+
+    def read(self, path):
+        import numpy as np
+        with np.load(path) as data:
+            columns = []
+            for column in self.columns:
+                if column == 'symptoms':
+                    columns.append(self._decode_symptoms(data))
+                elif column == 'id':
+                    columns.append([int(v) for v in data[column]])
+                elif column == 'confidence':
+                    columns.append([None if np.isnan(v) else float(v) for v in data[column]])
+                else:
+                    nulls = data[f"{column}_null"]
+                    columns.append([None if null else str(v) for v, null in zip(data[column], nulls)])
+        return list(zip(*columns))
+
+    def _encode_symptoms(self, values):
+        """Bitmask words per row; rows a bitmask can't reproduce exactly keep their raw text"""
+        import numpy as np
+        words = np.zeros((len(values), self.bitset.n_words), dtype=np.uint64)
+        raw = []
+        for row, value in enumerate(values):
+            try:
+                symptoms = json.loads(value)
+            except (TypeError, ValueError):
+                symptoms = None
+            mask = self.bitset.encode(symptoms) if isinstance(symptoms, list) else 0
+            if isinstance(symptoms, list) and json.dumps(self.bitset.decode(mask)) == value:
+                words[row] = self.bitset.to_words(mask)
+                raw.append('')
+            else:
+                raw.append(value)
+        return {'symptom_words': words, 'symptoms_raw': np.array(raw, dtype=str)}
+
+    def _decode_symptoms(self, data):
+        vocabulary = SymptomBitset([str(v) for v in data['vocabulary']])
+        decoded = []
+        for words, raw in zip(data['symptom_words'], data['symptoms_raw']):
+            if raw:
+                decoded.append(str(raw))
+                continue
+            mask = 0
+            for i, word in enumerate(words):
+                mask |= int(word) << (64 * i)
+            decoded.append(json.dumps(vocabulary.decode(mask)))
+        return decoded
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import diagnosis history and health tips")
+    parser.add_argument('action', choices=['export', 'import'])
+    parser.add_argument('table', choices=sorted(TABLE_COLUMNS))
+    parser.add_argument('path', help="file (.csv/.jsonl) or directory of .npz parts")
+    parser.add_argument('--format', choices=FORMATS)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--database', default="health_data.db")
+    parser.add_argument('--new-ids', action='store_true', help="assign new ids instead of keeping exported ones")
+    parser.add_argument('--restart', action='store_true', help="ignore any saved import checkpoint")
+    args = parser.parse_args()
+
+    database = HealthDatabase(args.database)
+    if args.action == 'export':
+        count = export_table(database, args.table, args.path, args.format, args.chunk_size)
+        print(f"Exported {count} {args.table} rows to {args.path}")
+    else:
+        count = import_table(database, args.table, args.path, args.format, args.chunk_size,
+                             keep_ids=not args.new_ids, resume=not args.restart)
+        print(f"Imported {count} {args.table} rows from {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -3,128 +3,392 @@
 import sqlite3
 import json
 import os
-from datetime import datetime
+import threading
+import weakref
+from datetime import datetime, timezone
+from schema import SchemaManager
+from stats import DiagnosisStats
+from tip_index import TipIndex, fallback_keyword
+from instrumentation import metrics
+
+class _ThreadConnection:
+    """Thread-local holder for a connection; dropped when its thread exits"""
+    __slots__ = ('conn', '__weakref__')
+    
+    def __init__(self, conn):
+        self.conn = conn
+
+class ConnectionManager:
+    """Hand out one long-lived, tuned SQLite connection per thread
+
+    A connection is closed when the thread that opened it exits, so
+    short-lived threads don't leak file handles.
+    """
+    
+    def __init__(self, db_path, timeout=30.0, cache_size_kb=8192, cached_statements=256):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.cache_size_kb = cache_size_kb
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+    
+    def get(self):
+        """Return the calling thread's connection, opening it on first use"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            holder = _ThreadConnection(self._connect())
+            self._local.holder = holder
+            with self._lock:
+                self._connections.add(holder.conn)
+            # Thread-local values are released when their thread ends
+            weakref.finalize(holder, self._release, holder.conn)
+        return holder.conn
+    
+    def _release(self, conn):
+        """Close a connection whose thread has exited (unless close_all already did)"""
+        with self._lock:
+            if conn not in self._connections:
+                return
+            self._connections.discard(conn)
+        try:
+            conn.close()
+        except Exception as e:
+            metrics.incr('db.errors')
+            print(f"Error closing connection: {e}")
+    
+    def _connect(self):
+        """Open a connection with WAL journaling and relaxed fsync"""
+        # Statements are compiled once and reused from the per-connection cache
+        metrics.incr('db.connections_opened')
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                               cached_statements=self.cached_statements,
+                               check_same_thread=False)
+        # Must precede the first write to take effect; RetentionManager converts older databases
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
+    def close_all(self):
+        """Close every connection opened by this manager"""
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                metrics.incr('db.errors')
+                print(f"Error closing connection: {e}")
+        self._local = threading.local()
+
+class HistoryRecord:
+    """One diagnosis history row; the symptoms JSON is only decoded when accessed"""
+    __slots__ = ('id', 'date', 'symptoms_raw', 'diagnosis', 'confidence', 'created_at', '_symptoms')
+    
+    def __init__(self, id, date, symptoms_raw, diagnosis, confidence, created_at):
+        self.id = id
+        self.date = date
+        self.symptoms_raw = symptoms_raw
+        self.diagnosis = diagnosis
+        self.confidence = confidence
+        self.created_at = created_at
+        self._symptoms = None
+    
+    @property
+    def cursor(self):
+        """Keyset position of this record for fetching the next page"""
+        return (self.created_at, self.id)
+    
+    @property
+    def symptoms(self):
+        """Decoded symptom list (or the raw value if it isn't a JSON list)"""
+        if self._symptoms is None:
+            try:
+                self._symptoms = json.loads(self.symptoms_raw)
+            except (TypeError, ValueError):
+                self._symptoms = self.symptoms_raw
+        return self._symptoms
+    
+    @property
+    def symptoms_display(self):
+        symptoms = self.symptoms
+        if isinstance(symptoms, list):
+            return ', '.join([s.replace('_', ' ').title() for s in symptoms])
+        return str(symptoms)
+    
+    def as_tuple(self):
+        """(date, symptoms_display, diagnosis, confidence), as returned by get_diagnosis_history"""
+        return (self.date, self.symptoms_display, self.diagnosis, self.confidence)
 
 class HealthDatabase:
+    INSERT_DIAGNOSIS_SQL = '''
+        INSERT INTO diagnoses (date, symptoms, diagnosis, confidence, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    '''
+    
     def __init__(self, db_name="health_data.db"):
         """Initialize database connection"""
         self.db_path = os.path.join(os.path.dirname(__file__), db_name)
+        self.connections = ConnectionManager(self.db_path)
+        self.stats = DiagnosisStats(self)
+        self.tip_index = TipIndex(self)
         self.init_database()
     
+    def connection(self):
+        """Return this thread's pooled connection (usable as a transaction context)"""
+        metrics.incr('db.queries')
+        return self.connections.get()
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.connections.close_all()
+    
     def init_database(self):
-        """Initialize database - tables already exist"""
-        # Tables are already created, no need to create them again
-        print("Database tables already exist - initialization complete")
+        """Create tables and indexes and apply pending schema migrations"""
+        try:
+            version = SchemaManager(self.connection()).migrate()
+            print(f"Database ready (schema version {version})")
+        except Exception as e:
+            metrics.incr('db.errors')
+            print(f"Error initializing database: {e}")
+    
+    @staticmethod
+    def diagnosis_row(symptoms, diagnosis, confidence):
+        """Build the (date, symptoms, diagnosis, confidence, created_at) row for an insert"""
+        symptoms_str = json.dumps(symptoms) if isinstance(symptoms, list) else str(symptoms)
+        date_str = datetime.now().strftime("%Y-%m-%d %H:%M")
+        # Same format as SQLite's CURRENT_TIMESTAMP, captured when the diagnosis is made
+        created_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        return (date_str, symptoms_str, diagnosis, float(confidence), created_at)
     
     def save_diagnosis(self, symptoms, diagnosis, confidence):
         """Save a diagnosis to the database"""
         try:
-            symptoms_str = json.dumps(symptoms) if isinstance(symptoms, list) else str(symptoms)
-            date_str = datetime.now().strftime("%Y-%m-%d %H:%M")
-            
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO diagnoses (date, symptoms, diagnosis, confidence)
-                    VALUES (?, ?, ?, ?)
-                ''', (date_str, symptoms_str, diagnosis, confidence))
-                conn.commit()
-                return True
+            self._insert_diagnosis(self.diagnosis_row(symptoms, diagnosis, confidence))
+            return True
         except Exception as e:
+            metrics.incr('db.errors')
             print(f"Error saving diagnosis: {e}")
             return False
     
+    def save_diagnoses(self, rows):
+        """Save many prepared diagnosis rows in a single transaction"""
+        try:
+            self._insert_diagnoses(rows)
+            return True
+        except Exception as e:
+            metrics.incr('db.errors')
+            print(f"Error saving diagnoses: {e}")
+            return False
+    
+    # The underscore query methods raise on failure instead of printing. The
+    # public methods wrap them for the desktop UI; AsyncHealthDatabase calls
+    # them directly so its callers get the exception.
+    
+    @metrics.timed('db.save_diagnosis')
+    def _insert_diagnosis(self, row):
+        """Insert one prepared diagnosis row; returns its id"""
+        with self.connection() as conn:
+            return conn.execute(self.INSERT_DIAGNOSIS_SQL, row).lastrowid
+    
+    @metrics.timed('db.save_diagnoses')
+    def _insert_diagnoses(self, rows):
+        """Insert prepared diagnosis rows in one transaction; returns how many"""
+        with self.connection() as conn:
+            return conn.executemany(self.INSERT_DIAGNOSIS_SQL, rows).rowcount
+    
     def get_diagnosis_history(self, limit=10):
         """Get recent diagnosis history"""
+        records, _ = self.get_history_page(page_size=limit)
+        return [record.as_tuple() for record in records]
+    
+    def get_history_page(self, cursor=None, page_size=10, start=None, end=None, diagnosis=None):
+        """Get one page of history, newest first, plus the cursor for the next page (None at the end)
+        
+        cursor is the (created_at, id) of the last record already seen; start and
+        end bound created_at ('YYYY-MM-DD' or full timestamps, end exclusive).
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT date, symptoms, diagnosis, confidence 
-                    FROM diagnoses 
-                    ORDER BY created_at DESC 
-                    LIMIT ?
-                ''', (limit,))
-                
-                results = []
-                for row in cursor.fetchall():
-                    date, symptoms_str, diagnosis, confidence = row
-                    
-                    # Parse symptoms
-                    try:
-                        symptoms = json.loads(symptoms_str)
-                        if isinstance(symptoms, list):
-                            symptoms_display = ', '.join([s.replace('_', ' ').title() for s in symptoms])
-                        else:
-                            symptoms_display = str(symptoms)
-                    except:
-                        symptoms_display = str(symptoms_str)
-                    
-                    results.append((date, symptoms_display, diagnosis, confidence))
-                
-                return results
+            records = self._fetch_history_page(cursor, page_size, start, end, diagnosis)
         except Exception as e:
+            metrics.incr('db.errors')
             print(f"Error retrieving history: {e}")
+            return [], None
+        next_cursor = records[-1].cursor if len(records) == page_size else None
+        return records, next_cursor
+    
+    def iter_diagnosis_history(self, start=None, end=None, diagnosis=None, page_size=500):
+        """Yield history records newest first, reading one keyset page at a time"""
+        cursor = None
+        while True:
+            records = self._fetch_history_page(cursor, page_size, start, end, diagnosis)
+            yield from records
+            if len(records) < page_size:
+                return
+            cursor = records[-1].cursor
+    
+    @metrics.timed('db.history_page')
+    def _fetch_history_page(self, cursor, page_size, start, end, diagnosis):
+        """Keyset-paginated query on (created_at, id)"""
+        clauses, params = [], []
+        if cursor is not None:
+            created_at, row_id = cursor
+            # A row-value comparison is a single index range; the equivalent OR form forces a scan
+            clauses.append('(created_at, id) < (?, ?)')
+            params.extend([created_at, row_id])
+        if start:
+            clauses.append('created_at >= ?')
+            params.append(start)
+        if end:
+            clauses.append('created_at < ?')
+            params.append(end)
+        if diagnosis:
+            clauses.append('diagnosis = ?')
+            params.append(diagnosis)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        params.append(page_size)
+        
+        rows = self.connection().execute(f'''
+            SELECT id, date, symptoms, diagnosis, confidence, created_at
+            FROM diagnoses {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        ''', params).fetchall()
+        return [HistoryRecord(*row) for row in rows]
+    
+    def get_recent_diagnoses(self, limit=3):
+        """Get the most recent diagnosis names, newest first"""
+        try:
+            return self._recent_diagnoses(limit)
+        except Exception as e:
+            metrics.incr('db.errors')
+            print(f"Error retrieving recent diagnoses: {e}")
             return []
     
-    def get_database_stats(self):
-        """Get basic database statistics"""
+    def _recent_diagnoses(self, limit):
+        rows = self.connection().execute('''
+            SELECT diagnosis FROM diagnoses
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        ''', (limit,)).fetchall()
+        return [row[0] for row in rows]
+    
+    def get_database_stats(self, top_k=5):
+        """Get basic database statistics from the incrementally maintained summaries"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Total diagnoses
-                cursor.execute('SELECT COUNT(*) FROM diagnoses')
-                total_diagnoses = cursor.fetchone()[0]
-                
-                # Most common diagnosis
-                cursor.execute('''
-                    SELECT diagnosis, COUNT(*) as count 
-                    FROM diagnoses 
-                    GROUP BY diagnosis 
-                    ORDER BY count DESC 
-                    LIMIT 1
-                ''')
-                most_common_result = cursor.fetchone()
-                most_common = f"{most_common_result[0]} ({most_common_result[1]}x)" if most_common_result else "None"
-                
-                # Database file size
-                try:
-                    db_size = os.path.getsize(self.db_path)
-                except:
-                    db_size = 0
-                
-                return {
-                    'total_diagnoses': total_diagnoses,
-                    'most_common': most_common,
-                    'database_size': db_size
-                }
+            return self._database_stats(top_k)
         except Exception as e:
+            metrics.incr('db.errors')
             print(f"Error getting stats: {e}")
-            return {'total_diagnoses': 0, 'most_common': 'Error', 'database_size': 0}
+            return {'total_diagnoses': 0, 'most_common': 'Error', 'top_diagnoses': [], 'database_size': 0}
     
-
+    @metrics.timed('db.get_database_stats')
+    def _database_stats(self, top_k):
+        total_diagnoses = self.stats.total()
+        top_diagnoses = self.stats.top_diagnoses(top_k)
+        most_common = f"{top_diagnoses[0][0]} ({top_diagnoses[0][1]}x)" if top_diagnoses else "None"
+        
+        # Database file size
+        try:
+            db_size = os.path.getsize(self.db_path)
+        except OSError:
+            db_size = 0
+        
+        return {
+            'total_diagnoses': total_diagnoses,
+            'most_common': most_common,
+            'top_diagnoses': top_diagnoses,
+            'database_size': db_size
+        }
 
     def get_tips_by_category(self, category):
         """Get tips by category"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT tip_text FROM health_tips WHERE category = ?
-                ''', (category,))
-                return [tip[0] for tip in cursor.fetchall()]
+            return self._tips_by_category(category)
         except Exception as e:
+            metrics.incr('db.errors')
             print(f"Error getting tips: {e}")
             return []
 
+    @metrics.timed('db.get_tips_by_category')
+    def _tips_by_category(self, category):
+        rows = self.connection().execute('''
+            SELECT tip_text FROM health_tips WHERE category = ?
+        ''', (category,)).fetchall()
+        return [tip[0] for tip in rows]
+
+    def search_tips(self, condition):
+        """Get tips for a medical condition, best matches first"""
+        try:
+            return self._search_tips(condition)
+        except Exception as e:
+            metrics.incr('db.errors')
+            print(f"Error getting disease tips: {e}")
+            return []
+
+    @metrics.timed('db.search_tips')
+    def _search_tips(self, condition):
+        if self.tip_index.is_available():
+            return self.tip_index.search(condition)
+        return self._search_tips_like(condition)
+
+    def _search_tips_like(self, condition):
+        """Fallback LIKE matching for SQLite builds without FTS5"""
+        # Normalize condition name for better matching
+        condition_normalized = condition.lower().replace(' ', '_')
+        
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            # Try multiple search patterns for better matching
+            cursor.execute('''
+                SELECT tip_text FROM health_tips 
+                WHERE condition_related = ? 
+                   OR condition_related = ?
+                   OR condition_related LIKE ?
+                   OR condition_related LIKE ?
+                ORDER BY category
+            ''', (condition, condition_normalized, f'%{condition}%', f'%{condition_normalized}%'))
+            
+            results = [tip[0] for tip in cursor.fetchall()]
+            
+            # If no specific tips found, try partial matching with key words
+            if not results:
+                word = fallback_keyword(condition_normalized)
+                if word:
+                    cursor.execute('''
+                        SELECT tip_text FROM health_tips 
+                        WHERE condition_related LIKE ?
+                    ''', (f'%{word}%',))
+                    results.extend([tip[0] for tip in cursor.fetchall()])
+            
+            return results
+
+    @metrics.timed('db.get_table_version')
+    def get_table_version(self, table):
+        """Get the change counter for a table (bumped by triggers on every write)"""
+        try:
+            row = self.connection().execute(
+                'SELECT version FROM table_versions WHERE name = ?', (table,)
+            ).fetchone()
+            return row[0] if row else 0
+        except Exception as e:
+            metrics.incr('db.errors')
+            print(f"Error getting table version: {e}")
+            return None
+
     def get_all_tips(self):
         """Get all health tips"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT category, tip_text FROM health_tips')
-                return cursor.fetchall()
+            return self._all_tips()
         except Exception as e:
+            metrics.incr('db.errors')
             print(f"Error getting tips: {e}")
             return []
+
+    @metrics.timed('db.get_all_tips')
+    def _all_tips(self):
+        return self.connection().execute('SELECT category, tip_text FROM health_tips').fetchall()
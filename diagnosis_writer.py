@@ -0,0 +1,158 @@
+import queue
+import sqlite3
+import threading
+import time
+from database import HealthDatabase
+from instrumentation import metrics
+
+class DiagnosisWriter:
+    """Write-behind buffer that saves diagnoses in batched transactions"""
+
+    def __init__(self, database, batch_size=500, flush_interval=1.0, max_queue=10000):
+        """Start the background flush thread"""
+        self.database = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._pending = []
+        self._pending_since = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # Set on submit; the thread only moves rows out of the queue under _lock,
+        # so flush() can never miss a row that is in flight between the two
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self.written = 0
+        self.rejected = 0
+        self.failed_flushes = 0
+        # Rows the database refused outright (constraint violations); never retried
+        self.dead_letters = []
+
+        self._thread = threading.Thread(target=self._run, name="DiagnosisWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, symptoms, diagnosis, confidence, block=False, timeout=None):
+        """Queue a diagnosis for saving; returns False when the queue is full"""
+        if self._closed:
+            raise RuntimeError("DiagnosisWriter is closed")
+        if not diagnosis:
+            raise ValueError("A diagnosis is required")
+        row = HealthDatabase.diagnosis_row(symptoms, diagnosis, confidence)
+        try:
+            self._queue.put(row, block, timeout)
+            self._wakeup.set()
+            return True
+        except queue.Full:
+            self.rejected += 1
+            return False
+
+    @property
+    def backlog(self):
+        """Number of diagnoses waiting to be written"""
+        return self._queue.qsize() + len(self._pending)
+
+    def is_saturated(self):
+        """True when new submissions would currently be rejected"""
+        return self._queue.full()
+
+    def flush(self):
+        """Write everything queued so far; returns True if nothing is left unsaved"""
+        with self._lock:
+            self._drain(limit=None)
+            return self._write_pending()
+
+    def close(self):
+        """Stop the background thread and flush remaining diagnoses"""
+        if self._closed:
+            return not self.backlog
+        self._closed = True
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join()
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _run(self):
+        """Collect queued rows and flush on size or age thresholds"""
+        while not self._stop.is_set():
+            if len(self._pending) >= self.batch_size:
+                # A full batch is only left over after a failed write: back off, then retry
+                self._stop.wait(self.flush_interval)
+                with self._lock:
+                    self._write_pending()
+                continue
+
+            timeout = self.flush_interval
+            if self._pending_since is not None:
+                timeout = max(0.0, self._pending_since + self.flush_interval - time.monotonic())
+            if self._queue.empty():
+                # Only sleep when idle; a burst is written batch after batch
+                self._wakeup.wait(min(timeout, 0.25) or 0.001)
+            # Clear before draining: a row queued after the drain sets it again
+            self._wakeup.clear()
+
+            with self._lock:
+                self._drain(limit=self.batch_size)
+                due = (self._pending_since is not None and
+                       time.monotonic() - self._pending_since >= self.flush_interval)
+                if len(self._pending) >= self.batch_size or due:
+                    self._write_pending()
+
+    def _add_pending(self, row):
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending.append(row)
+
+    def _drain(self, limit):
+        """Move queued rows into the pending batch (up to limit rows pending)"""
+        while limit is None or len(self._pending) < limit:
+            try:
+                self._add_pending(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+    def _write_pending(self):
+        """Insert the pending batch; on a transient failure keep it for the next attempt"""
+        if not self._pending:
+            return True
+        try:
+            self.database._insert_diagnoses(self._pending)
+            self.written += len(self._pending)
+            self._pending = []
+        except sqlite3.IntegrityError as e:
+            # A row that can never be inserted must not hold back the rest of the batch
+            metrics.incr('db.errors')
+            print(f"Error saving diagnoses, retrying rows one at a time: {e}")
+            self._write_rows_individually()
+        except Exception as e:
+            metrics.incr('db.errors')
+            print(f"Error saving diagnoses: {e}")
+        if self._pending:
+            # Rows stay pending, so a stuck database backs up into the queue
+            # and shows up as rejected submissions instead of silent data loss
+            self.failed_flushes += 1
+            self._pending_since = time.monotonic()
+            return False
+        self._pending_since = None
+        return True
+
+    def _write_rows_individually(self):
+        """Insert pending rows one by one, moving rejected rows to dead_letters"""
+        pending, self._pending = self._pending, []
+        for position, row in enumerate(pending):
+            try:
+                self.database._insert_diagnosis(row)
+                self.written += 1
+            except sqlite3.IntegrityError as e:
+                print(f"Error saving diagnosis, discarding it: {e}")
+                self.dead_letters.append(row)
+            except Exception as e:
+                print(f"Error saving diagnoses: {e}")
+                self._pending = pending[position:]
+                return
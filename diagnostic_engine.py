@@ -1,80 +1,170 @@
 
 
-from sklearn.tree import DecisionTreeClassifier
 import numpy as np
+import os
+from cache import LRUCache
+from instrumentation import metrics
+from model_store import ModelStore
+from knowledge_base import get_knowledge_base
 
 class DiagnosticEngine:
-    def __init__(self):
-        self.illnesses = {
-            'common_cold': ['runny_nose', 'sore_throat', 'cough', 'fatigue'],
-            'flu': ['fever', 'muscle_aches', 'fatigue', 'headache', 'cough'],
-            'pneumonia': ['fever', 'cough', 'chest_pain', 'shortness_of_breath'],
-            'gastroenteritis': ['nausea', 'vomiting', 'diarrhea', 'stomach_pain', 'abdominal_pain'],
-            'migraine': ['headache', 'nausea', 'blurred_vision', 'dizziness'],
-            'allergic_reaction': ['rash', 'runny_nose', 'shortness_of_breath'],
-            'urinary_tract_infection': ['frequent_urination', 'difficulty_urinating', 'fever'],
-            'arthritis': ['joint_pain', 'muscle_aches', 'fatigue'],
-            'anxiety_disorder': ['chest_pain', 'shortness_of_breath', 'dizziness', 'fatigue', 'anxiety', 'restlessness'],
-            'depression': ['fatigue', 'loss_of_appetite', 'memory_problems', 'difficulty_sleeping', 'weakness'],
-            'diabetes': ['frequent_urination', 'fatigue', 'blurred_vision', 'weight_loss'],
-            'hypertension': ['headache', 'dizziness', 'chest_pain', 'shortness_of_breath', 'high_blood_pressure'],
-            'hypotension': ['dizziness', 'weakness', 'fatigue', 'low_blood_pressure'],
-            'anemia': ['fatigue', 'weakness', 'pale_skin', 'shortness_of_breath'],
-            'heart_disease': ['chest_pain', 'shortness_of_breath', 'rapid_heartbeat', 'irregular_heartbeat'],
-            'acid_reflux': ['heartburn', 'acid_reflux', 'chest_pain', 'dry_mouth'],
-            'insomnia': ['difficulty_sleeping', 'insomnia', 'fatigue', 'memory_problems']
-        }
-        
-        self.all_symptoms = ['fever', 'headache', 'cough', 'sore_throat', 'runny_nose', 'fatigue',
-                           'nausea', 'vomiting', 'diarrhea', 'stomach_pain', 'muscle_aches',
-                           'chest_pain', 'shortness_of_breath', 'dizziness', 'rash', 'joint_pain',
-                           'back_pain', 'difficulty_swallowing', 'loss_of_appetite', 'weight_loss',
-                           'night_sweats', 'chills', 'confusion', 'memory_problems', 'blurred_vision',
-                           'ear_pain', 'difficulty_urinating', 'frequent_urination', 'constipation',
-                           'difficulty_sleeping', 'insomnia', 'anxiety', 'stress', 'weakness',
-                           'tremors', 'sweating', 'dry_mouth', 'abdominal_pain', 'bloating',
-                           'heartburn', 'acid_reflux', 'swollen_lymph_nodes', 'bruising',
-                           'pale_skin', 'rapid_heartbeat', 'irregular_heartbeat', 'high_blood_pressure',
-                           'low_blood_pressure', 'tingling', 'numbness', 'leg_cramps', 'restlessness']
-        
-        self.clf = DecisionTreeClassifier(random_state=42)
-        self._train_model()
+    TRAINING_SEED = 42
+    SAMPLES_PER_ILLNESS = 5
+    MODES = ('model', 'rules')
+    
+    def __init__(self, model_store=None, mode='model', cache_size=4096, cache_ttl=None, knowledge_base=None):
+        """Set up the knowledge base; mode='rules' scores by symptom overlap without scikit-learn"""
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown diagnosis mode: {mode}")
+        self.mode = mode
+        
+        # Shared, read-only vocabulary and illness definitions with precompiled indexes
+        self.knowledge_base = knowledge_base or get_knowledge_base()
+        self.illnesses = self.knowledge_base.illnesses
+        self.all_symptoms = self.knowledge_base.symptoms
+        self.symptom_index = self.knowledge_base.symptom_ids
+        self.bitset = self.knowledge_base.bitset
+        self.illness_matrix = self.knowledge_base.illness_matrix
+        
+        self.clf = None
+        self.model_store = model_store or ModelStore()
+        self.model_hash = None
+        self.lookup_table = None
+        self.result_cache = LRUCache(cache_size, cache_ttl, name='diagnosis')
+        # Part of every cache key, bumped whenever the model changes, so a result
+        # computed with the old model while it was being swapped is never served
+        self._generation = 0
+        if mode == 'model':
+            self._init_model()
+    
+    def _init_model(self):
+        """Load the stored decision tree, or train and store a new one"""
+        import sklearn
+        from sklearn.tree import DecisionTreeClassifier
+        
+        all_symptoms, illnesses = self.knowledge_base.training_inputs()
+        self.model_hash = ModelStore.content_hash(
+            all_symptoms, illnesses,
+            self.SAMPLES_PER_ILLNESS, self.TRAINING_SEED, sklearn.__version__
+        )
+        if not self._load_model():
+            self.clf = DecisionTreeClassifier(random_state=42)
+            self._train_model()
+            self.model_store.save(self.model_hash, clf=self.clf,
+                                  all_symptoms=all_symptoms, illnesses=illnesses)
+    
+    def enable_lookup_table(self, max_size=4, path=None):
+        """Answer symptom sets of up to max_size symptoms from a precomputed table
+
+        The table is loaded from disk when it matches the current model and
+        rebuilt otherwise. Larger symptom sets still go through the model.
+        """
+        if self.mode != 'model':
+            return False
+        from lookup_table import DiagnosisLookupTable
+        
+        path = path or os.path.join(self.model_store.directory, 'diagnosis_lookup')
+        table = DiagnosisLookupTable(path, self.all_symptoms, max_size)
+        if not table.load(self.model_hash) and not table.build(self):
+            return False
+        self.lookup_table = table
+        self._reset_results()
+        return True
+    
+    def swap_model(self, clf, model_hash):
+        """Atomically start serving a different trained classifier"""
+        # The lookup table and cached results belong to the old model
+        self.lookup_table = None
+        self.clf = clf
+        self.model_hash = model_hash
+        self._reset_results()
+    
+    def _reset_results(self):
+        """Drop cached results after the model changes"""
+        self._generation += 1
+        self.result_cache.clear()
+    
+    def _load_model(self):
+        """Load a stored model trained on the current knowledge base"""
+        artifact = self.model_store.load(self.model_hash)
+        if not artifact or artifact.get('all_symptoms') != list(self.all_symptoms):
+            return False
+        self.clf = artifact['clf']
+        self._reset_results()
+        return True
     
     def _train_model(self):
         """Train the decision tree model"""
+        X, y = self.synthetic_training_data()
+        self.clf.fit(X, y)
+        self._reset_results()
+    
+    def synthetic_training_data(self):
+        """Noisy samples generated from the illness table (seeded, so always the same)"""
         X, y = [], []
+        rng = np.random.RandomState(self.TRAINING_SEED)
         
         for illness, symptoms in self.illnesses.items():
-            for _ in range(5):  # Generate multiple samples per illness
+            for _ in range(self.SAMPLES_PER_ILLNESS):  # Generate multiple samples per illness
                 sample = [0] * len(self.all_symptoms)
                 for symptom in symptoms:
-                    if symptom in self.all_symptoms:
-                        sample[self.all_symptoms.index(symptom)] = 1
+                    if symptom in self.symptom_index:
+                        sample[self.symptom_index[symptom]] = 1
                 
                 # Add some noise
                 for i in range(len(sample)):
-                    if np.random.random() < 0.1:
+                    if rng.random_sample() < 0.1:
                         sample[i] = 1 - sample[i]
                 
                 X.append(sample)
                 y.append(illness)
         
-        self.clf.fit(X, y)
+        return X, y
     
+    @metrics.timed('diagnosis.analyze_symptoms')
     def analyze_symptoms(self, user_symptoms):
         """Analyze symptoms and return possible diagnoses"""
         if not user_symptoms:
             return []
         
+        key = (self._generation, self._cache_key(user_symptoms))
+        cached = self.result_cache.get(key)
+        if cached is None:
+            cached = self._analyze_uncached(user_symptoms)
+            if key[0] == self._generation:
+                self.result_cache.put(key, cached)
+        return _copy_results(cached)
+    
+    def _cache_key(self, user_symptoms):
+        """Canonical form of a symptom list: the sorted set of known symptoms"""
+        return tuple(sorted({s for s in user_symptoms if s in self.symptom_index}))
+    
+    def cache_stats(self):
+        """Return diagnosis cache hit/miss counters"""
+        return self.result_cache.stats()
+    
+    def _analyze_uncached(self, user_symptoms):
+        """Diagnose one non-empty symptom list without consulting the result cache"""
+        if self.mode == 'rules':
+            return self._analyze_rules(user_symptoms)
+        lookup_table = self.lookup_table  # read once: swap_model may clear it concurrently
+        if lookup_table is not None:
+            results = lookup_table.lookup(user_symptoms)
+            if results is not None:
+                metrics.incr('diagnosis.lookup_table_hits')
+                return results
+        
         # Convert symptoms to feature vector
         features = [0] * len(self.all_symptoms)
         for symptom in user_symptoms:
-            if symptom in self.all_symptoms:
-                features[self.all_symptoms.index(symptom)] = 1
+            if symptom in self.symptom_index:
+                features[self.symptom_index[symptom]] = 1
         
         # Get prediction probabilities
-        probabilities = self.clf.predict_proba([features])[0]
-        classes = self.clf.classes_
+        clf = self.clf  # read once: swap_model may replace it concurrently
+        with metrics.timer('diagnosis.predict_proba'):
+            probabilities = clf.predict_proba([features])[0]
+        classes = clf.classes_
         
         # Create diagnosis results
         results = []
@@ -90,11 +180,103 @@ class DiagnosticEngine:
         results.sort(key=lambda x: x['confidence'], reverse=True)
         return results[:3]  # Return top 3
     
+    @metrics.timed('diagnosis.analyze_batch')
+    def analyze_batch(self, symptom_lists, use_cache=True):
+        """Analyze many symptom lists at once, returning one result list per input"""
+        if not symptom_lists:
+            return []
+        if not use_cache:
+            return self._analyze_batch_uncached(symptom_lists)
+        
+        # Serve repeats from the cache and score each distinct missing set once
+        results = [None] * len(symptom_lists)
+        missing = {}
+        generation = self._generation
+        for row, user_symptoms in enumerate(symptom_lists):
+            if not user_symptoms:
+                results[row] = []
+                continue
+            key = self._cache_key(user_symptoms)
+            cached = self.result_cache.get((generation, key))
+            if cached is None:
+                missing.setdefault(key, []).append(row)
+            else:
+                results[row] = _copy_results(cached)
+        
+        if missing:
+            keys = list(missing)
+            # Unknown symptoms never affect a diagnosis, so the canonical key scores the same
+            computed = self._analyze_batch_uncached([list(key) or [None] for key in keys])
+            current = generation == self._generation
+            for key, diagnoses in zip(keys, computed):
+                if current:
+                    self.result_cache.put((generation, key), diagnoses)
+                for row in missing[key]:
+                    results[row] = _copy_results(diagnoses)
+        return results
+    
+    def _analyze_batch_uncached(self, symptom_lists):
+        """Vectorized diagnosis of a batch without consulting the result cache"""
+        if self.mode == 'rules':
+            return [self._analyze_rules(symptoms) if symptoms else [] for symptoms in symptom_lists]
+        
+        features = self._encode_batch(symptom_lists)
+        clf = self.clf
+        with metrics.timer('diagnosis.predict_proba_batch'):
+            probabilities = clf.predict_proba(features)
+        classes = clf.classes_
+        
+        # Top 3 classes per row, highest confidence first (stable, like list.sort)
+        top_k = min(3, probabilities.shape[1])
+        top = np.argsort(-probabilities, axis=1, kind='stable')[:, :top_k]
+        top_probs = np.take_along_axis(probabilities, top, axis=1)
+        significant = top_probs > 0.1
+        
+        display_names = [c.replace('_', ' ').title() for c in classes]
+        batch_results = []
+        for row, user_symptoms in enumerate(symptom_lists):
+            if not user_symptoms:
+                batch_results.append([])
+                continue
+            results = []
+            for col in range(top_k):
+                if not significant[row, col]:
+                    continue
+                class_idx = top[row, col]
+                results.append({
+                    'name': display_names[class_idx],
+                    'confidence': top_probs[row, col] * 100,
+                    'symptoms_match': self._calculate_symptom_match(user_symptoms, classes[class_idx])
+                })
+            batch_results.append(results)
+        return batch_results
+    
+    def _encode_batch(self, symptom_lists):
+        """Encode symptom lists into a single binary feature matrix"""
+        rows, cols = [], []
+        for row, user_symptoms in enumerate(symptom_lists):
+            for symptom in user_symptoms or ():
+                col = self.symptom_index.get(symptom)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        
+        features = np.zeros((len(symptom_lists), len(self.all_symptoms)), dtype=np.float32)
+        features[rows, cols] = 1
+        return features
+    
+    def _analyze_rules(self, user_symptoms):
+        """Deterministic diagnosis by Jaccard overlap with each illness's symptoms"""
+        ranked = self.illness_matrix.rank(self.bitset.encode(user_symptoms), top_k=3)
+        return [{
+            'name': illness.replace('_', ' ').title(),
+            'confidence': score * 100,
+            'symptoms_match': matches
+        } for illness, score, matches in ranked]
+    
     def _calculate_symptom_match(self, user_symptoms, illness):
         """Calculate how many symptoms match the illness"""
-        illness_symptoms = self.illnesses.get(illness, [])
-        matches = len(set(user_symptoms) & set(illness_symptoms))
-        return matches
+        return self.illness_matrix.match_count(self.bitset.encode(user_symptoms), illness)
     
     def format_diagnosis_report(self, diagnoses, symptoms):
         """Format diagnosis results into a readable report"""
@@ -112,3 +294,7 @@ class DiagnosticEngine:
         
         report += "DISCLAIMER: This is for informational purposes only.\nAlways consult a healthcare professional for proper diagnosis!"
         return report
+
+def _copy_results(results):
+    """Copy cached diagnoses so callers can't modify the cached entries"""
+    return [dict(diagnosis) for diagnosis in results]
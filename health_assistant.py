@@ -1,20 +1,43 @@
+import sys
+import time
+_START = time.perf_counter()
+
+import queue
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, ttk
+from concurrent.futures import ThreadPoolExecutor
 
 try:
+    # DiagnosticEngine (NumPy/scikit-learn) is imported later, off the UI thread
     from symptom_checker import SymptomChecker
-    from diagnostic_engine import DiagnosticEngine
     from health_tips import HealthTips
     from database import HealthDatabase
+    from symptom_picker import SymptomPicker
 except ImportError as e:
     print(f"Error: {e}"); exit(1)
 
+def log_startup(message):
+    """Report a startup milestone with the time since the process started"""
+    print(f"[startup] {message}: {(time.perf_counter() - _START) * 1000:.0f} ms", file=sys.stderr)
+
+log_startup("imports done")
+
 class HealthAssistant:
+    POLL_MS = 50
+    HISTORY_PAGE_SIZE = 10
+    
     def __init__(self):
-        # Initialize all modules
-        self.symptom_checker, self.diagnostic_engine = SymptomChecker(), DiagnosticEngine()
-        self.health_tips, self.database = HealthTips(), HealthDatabase()
+        # Initialize all modules (one database shared by everything)
+        self.symptom_checker, self.database = SymptomChecker(), HealthDatabase()
+        self.health_tips = HealthTips(self.database)
         self.current_symptoms = {}
+        self.symptom_picker = None
+        
+        # Slow work (model, SQLite, browser) runs here; results come back through the queue
+        self.executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="health-assistant")
+        self._results = queue.Queue()
+        self._busy_tasks = 0
+        self._engine_future = None
         
         # Setup main window
         self.root = tk.Tk()
@@ -41,6 +64,14 @@ class HealthAssistant:
         self.symptoms_label = tk.Label(self.root, text="No symptoms recorded", font=('Arial', 10), fg='blue')
         self.symptoms_label.pack(pady=10)
         
+        status_frame = tk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill="x", padx=20, pady=(0, 5))
+        self.status_label = tk.Label(status_frame, text="Ready", font=('Arial', 9), fg='gray')
+        self.status_label.pack(side=tk.LEFT)
+        self.progress = ttk.Progressbar(status_frame, mode='indeterminate', length=150)
+        self.load_more_button = tk.Button(status_frame, text="Load More", command=self.load_more_history)
+        self._history_cursor, self._history_shown = None, 0
+        
         results_frame = tk.LabelFrame(self.root, text="Results", font=('Arial', 12, 'bold'))
         results_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
@@ -51,53 +82,87 @@ class HealthAssistant:
         scrollbar.pack(side=tk.RIGHT, fill="y")
         
         self.update_results("Welcome! Select symptoms and get AI diagnosis.")
+        
+        # Load the model once the window is up, so it doesn't delay the first paint
+        self.root.after_idle(self._on_window_ready)
+        self.root.after(self.POLL_MS, self._poll_results)
+    
+    def _on_window_ready(self):
+        log_startup("window ready")
+        self._start_engine_loading()
+    
+    def _start_engine_loading(self):
+        """Import and build the diagnostic engine in the background (once)"""
+        if self._engine_future is None:
+            self._engine_future = self.executor.submit(self._load_engine)
+        return self._engine_future
+    
+    def run_in_background(self, task, on_done, busy_text="Working..."):
+        """Run task() on a worker thread and hand its result to on_done() on the Tk thread"""
+        self._set_busy(busy_text, 1)
+        future = self.executor.submit(task)
+        future.add_done_callback(lambda f: self._results.put((f, on_done)))
+    
+    def _poll_results(self):
+        """Deliver finished background results to their callbacks"""
+        try:
+            while True:
+                future, on_done = self._results.get_nowait()
+                self._set_busy(None, -1)
+                try:
+                    on_done(future.result())
+                except Exception as e:
+                    # A failing task or callback must not stop later results from being delivered
+                    messagebox.showerror("Error", f"Operation failed: {e}")
+        except queue.Empty:
+            pass
+        finally:
+            self.root.after(self.POLL_MS, self._poll_results)
+    
+    def _set_busy(self, text, delta):
+        """Show or hide the busy indicator as background tasks start and finish"""
+        self._busy_tasks += delta
+        if self._busy_tasks > 0:
+            if text:
+                self.status_label.config(text=text, fg='darkorange')
+            if delta > 0 and self._busy_tasks == 1:
+                self.progress.pack(side=tk.RIGHT)
+                self.progress.start(10)
+                self.root.config(cursor='watch')
+        else:
+            self.progress.stop()
+            self.progress.pack_forget()
+            self.status_label.config(text="Ready", fg='gray')
+            self.root.config(cursor='')
+    
+    @staticmethod
+    def _load_engine():
+        started = time.perf_counter()
+        from diagnostic_engine import DiagnosticEngine
+        imported = time.perf_counter()
+        engine = DiagnosticEngine()
+        print(f"[startup] diagnostic engine ready: import {(imported - started) * 1000:.0f} ms, "
+              f"load/train {(time.perf_counter() - imported) * 1000:.0f} ms", file=sys.stderr)
+        return engine
+    
+    @property
+    def diagnostic_engine(self):
+        """The diagnostic engine, waiting for the background load if needed"""
+        return self._start_engine_loading().result()
     
     def report_symptoms(self):
-        """Symptom selection window"""
-        window = tk.Toplevel(self.root)
-        window.title("Select Symptoms")
-        window.geometry("450x600")  # Made larger
-        tk.Label(window, text="Select your symptoms:", font=('Arial', 12, 'bold')).pack(pady=10)
-        
-        # Create scrollable frame
-        canvas = tk.Canvas(window)
-        scrollbar = tk.Scrollbar(window, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # Add symptoms to scrollable frame
-        self.symptom_vars = {}
-        for symptom in self.symptom_checker.get_available_symptoms():
-            var = tk.BooleanVar()
-            tk.Checkbutton(scrollable_frame, text=symptom.replace('_', ' ').title(), 
-                          variable=var, font=('Arial', 10)).pack(anchor='w', padx=20, pady=2)
-            self.symptom_vars[symptom] = var
-        
-        # Pack canvas and scrollbar
-        canvas.pack(side="left", fill="both", expand=True, padx=20, pady=(0, 10))
-        scrollbar.pack(side="right", fill="y", pady=(0, 10))
-        
-        tk.Button(window, text="Save", bg='lightgreen', font=('Arial', 11, 'bold'),
-                 command=lambda: self.save_symptoms(window)).pack(pady=10)
+        """Symptom selection window (built once, reused on every opening)"""
+        if self.symptom_picker is None:
+            self.symptom_picker = SymptomPicker(self.root, self.symptom_checker.get_available_symptoms(),
+                                                self.save_symptoms)
+        self.symptom_picker.open(self.current_symptoms)
     
-    def save_symptoms(self, window):
+    def save_symptoms(self, selected):
         """Save selected symptoms"""
-        selected = [s for s, var in self.symptom_vars.items() if var.get()]
-        if not selected:
-            return messagebox.showwarning("No Selection", "Please select at least one symptom!")
-        
         self.current_symptoms = {s: True for s in selected}
         symptoms_text = ", ".join([s.replace('_', ' ').title() for s in selected])
         self.symptoms_label.config(text=f"Current: {symptoms_text}")
         self.update_results(f"Recorded: {symptoms_text}")
-        window.destroy()
     
     def get_diagnosis(self):
         """Get AI diagnosis"""
@@ -105,38 +170,66 @@ class HealthAssistant:
             return messagebox.showwarning("No Symptoms", "Please report symptoms first!")
         
         symptoms_list = list(self.current_symptoms.keys())
-        diagnoses = self.diagnostic_engine.analyze_symptoms(symptoms_list)
+        busy_text = "Diagnosing..." if self._start_engine_loading().done() else "Loading diagnosis engine..."
+        self.run_in_background(lambda: self._diagnose(symptoms_list), self.update_results, busy_text)
+    
+    def _diagnose(self, symptoms_list):
+        """Run the diagnosis and save it (worker thread)"""
+        try:
+            engine = self.diagnostic_engine
+        except Exception as e:
+            return f"Could not load the diagnosis engine: {e}"
         
-        if diagnoses:
-            top = diagnoses[0]
-            self.database.save_diagnosis(symptoms_list, top['name'], top['confidence'])
-            report = self.diagnostic_engine.format_diagnosis_report(diagnoses, symptoms_list)
-            self.update_results(report + "\nSaved to database!")
-        else:
-            self.update_results("No diagnosis found. Please consult a doctor.")
+        diagnoses = engine.analyze_symptoms(symptoms_list)
+        if not diagnoses:
+            return "No diagnosis found. Please consult a doctor."
+        
+        top = diagnoses[0]
+        self.database.save_diagnosis(symptoms_list, top['name'], top['confidence'])
+        report = engine.format_diagnosis_report(diagnoses, symptoms_list)
+        return report + "\nSaved to database!"
     
     def view_history(self):
         """Show diagnosis history"""
-        history = self.database.get_diagnosis_history(10)
-        if not history:
+        self._history_cursor, self._history_shown = None, 0
+        self.run_in_background(lambda: self.database.get_history_page(page_size=self.HISTORY_PAGE_SIZE),
+                               self._show_history, "Loading history...")
+    
+    def load_more_history(self):
+        """Append the next page of diagnosis history"""
+        cursor = self._history_cursor
+        self.load_more_button.pack_forget()
+        self.run_in_background(lambda: self.database.get_history_page(cursor, self.HISTORY_PAGE_SIZE),
+                               lambda page: self._show_history(page, append=True), "Loading more history...")
+    
+    def _show_history(self, page, append=False):
+        records, self._history_cursor = page
+        if not records and not append:
             return messagebox.showinfo("No History", "No previous diagnoses found.")
         
-        text = "DIAGNOSIS HISTORY:\n\n"
-        for i, (date, symptoms, diagnosis, confidence) in enumerate(history, 1):
-            text += f"{i}. {date}\n   Symptoms: {symptoms}\n   Diagnosis: {diagnosis}"
-            text += f" ({confidence:.1f}%)" if confidence > 0 else ""
+        text = "" if append else "DIAGNOSIS HISTORY:\n\n"
+        for i, record in enumerate(records, self._history_shown + 1):
+            text += f"{i}. {record.date}\n   Symptoms: {record.symptoms_display}\n   Diagnosis: {record.diagnosis}"
+            text += f" ({record.confidence:.1f}%)" if record.confidence and record.confidence > 0 else ""
             text += "\n\n"
-        self.update_results(text)
+        self._history_shown += len(records)
+        
+        if append:
+            self.results_text.insert(tk.END, text)
+        else:
+            self.update_results(text)
+        if self._history_cursor is not None:
+            self.load_more_button.pack(side=tk.RIGHT, padx=5)
     
     def show_tips(self):
         """Show smart health tips (automatically personalized or general)"""
-        result_message = self.health_tips.show_smart_tips()
-        self.update_results(result_message)
+        self.run_in_background(self.health_tips.show_smart_tips, self.update_results, "Preparing health tips...")
     
     def show_stats(self):
         """Show database statistics"""
-        stats = self.database.get_database_stats()
-        
+        self.run_in_background(self.database.get_database_stats, self._show_stats, "Loading statistics...")
+    
+    def _show_stats(self, stats):
         text = f"DATABASE STATISTICS\n\nDiagnosis Records:\nTotal Diagnoses: {stats['total_diagnoses']}\n"
         text += f"Most Common: {stats['most_common']}\n\n"
         text += f"Database Size: {stats['database_size']} bytes\nLocation: {self.database.db_path}\n\nAll data permanently saved!"
@@ -144,12 +237,16 @@ class HealthAssistant:
     
     def update_results(self, text):
         """Update results display"""
+        self.load_more_button.pack_forget()
         self.results_text.delete(1.0, tk.END)
         self.results_text.insert(1.0, text)
     
     def run(self):
         """Start the application"""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.executor.shutdown(wait=False)
 
 if __name__ == "__main__":
     print("Starting Health Assistant...")
@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from symptom_checker import SymptomChecker
+from diagnostic_engine import DiagnosticEngine
+from health_tips import HealthTips
+from database import HealthDatabase
+from async_database import AsyncHealthDatabase, DatabaseBusyError, DatabaseError
+from diagnosis_writer import DiagnosisWriter
+from instrumentation import metrics
+
+class HTTPError(Exception):
+    """Error that maps directly to an HTTP status response"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class RawResponse:
+    """Non-JSON response body with its content type"""
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.content_type = content_type
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+class HealthService:
+    """Headless asyncio HTTP/JSON front end for diagnosis, history and tips"""
+
+    MAX_BODY = 1024 * 1024
+
+    def __init__(self, diagnostic_engine=None, database=None, health_tips=None,
+                 max_concurrency=32, queue_timeout=5.0, workers=8):
+        self.symptom_checker = SymptomChecker()
+        self.diagnostic_engine = diagnostic_engine or DiagnosticEngine()
+        self.database = database or HealthDatabase()
+        self.health_tips = health_tips or HealthTips(self.database)
+        self.writer = DiagnosisWriter(self.database)
+        # History and stats reads run on dedicated reader threads, never behind writes
+        self.async_database = AsyncHealthDatabase(self.database)
+
+        # Blocking sklearn/SQLite work runs here, never on the event loop
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="health-service")
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._slots = None
+
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('POST', '/diagnose'): self.diagnose,
+            ('GET', '/history'): self.history,
+            ('GET', '/stats'): self.stats,
+            ('GET', '/tips'): self.tips,
+            ('GET', '/tips.html'): self.tips_page,
+            ('GET', '/metrics'): self.metrics,
+        }
+
+    async def run_blocking(self, func, *args):
+        """Run a blocking call on the worker pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    # Endpoints
+
+    async def health(self, query, body):
+        return {'status': 'ok'}
+
+    async def metrics(self, query, body):
+        """Prometheus text by default, JSON with ?format=json"""
+        if query.get('format', [''])[0] == 'json':
+            return metrics.snapshot()
+        return RawResponse(metrics.to_prometheus(), PROMETHEUS_CONTENT_TYPE)
+
+    async def diagnose(self, query, body):
+        """POST {"symptoms": [...], "save": false} -> ranked diagnoses and report"""
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        symptoms = body.get('symptoms')
+        if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+            raise HTTPError(400, "'symptoms' must be a list of strings")
+        symptoms = self.symptom_checker.validate_symptoms(symptoms)
+        if not symptoms:
+            raise HTTPError(400, "No recognised symptoms given")
+
+        diagnoses = await self.run_blocking(self.diagnostic_engine.analyze_symptoms, symptoms)
+        report = self.diagnostic_engine.format_diagnosis_report(diagnoses, symptoms)
+
+        saved = False
+        if body.get('save') and diagnoses:
+            saved = self.writer.submit(symptoms, diagnoses[0]['name'], diagnoses[0]['confidence'])
+        return {'symptoms': symptoms, 'diagnoses': diagnoses, 'report': report, 'saved': saved}
+
+    async def history(self, query, body):
+        """GET /history?limit=N -> most recent diagnoses"""
+        limit = _int_param(query, 'limit', 10, 1, 1000)
+        rows = await self.async_database.get_diagnosis_history(limit)
+        return {'history': [
+            {'date': date, 'symptoms': symptoms, 'diagnosis': diagnosis, 'confidence': confidence}
+            for date, symptoms, diagnosis, confidence in rows
+        ]}
+
+    async def stats(self, query, body):
+        """GET /stats -> database statistics"""
+        return await self.async_database.get_database_stats()
+
+    async def tips(self, query, body):
+        """GET /tips?diagnoses=flu,migraine -> personalized (or general) tips"""
+        diagnoses = [d for value in query.get('diagnoses', []) for d in value.split(',') if d.strip()]
+        tips = await self.run_blocking(self.health_tips.get_personalized_tips, diagnoses or None)
+        return {'diagnoses': diagnoses, 'tips': tips}
+
+    async def tips_page(self, query, body):
+        """GET /tips.html?diagnoses=flu,migraine -> the same tips as an HTML page"""
+        diagnoses = [d for value in query.get('diagnoses', []) for d in value.split(',') if d.strip()]
+        tips = await self.run_blocking(self.health_tips.get_personalized_tips, diagnoses or None)
+        if diagnoses:
+            title = f"Personalized Tips Based on: {', '.join(d.replace('_', ' ').title() for d in diagnoses[:2])}"
+        else:
+            title = "General Health Tips"
+        return RawResponse(self.health_tips.render_tips_html(tips, title), 'text/html; charset=utf-8')
+
+    # HTTP plumbing
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until it closes"""
+        try:
+            keep_alive = True
+            while keep_alive:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                status, payload = await self._dispatch(method, target, body)
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+        except HTTPError as e:
+            self._write_response(writer, e.status, {'error': e.message}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, raw_body):
+        """Route a request, applying the concurrency limit"""
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            allowed = any(path == url.path for _, path in self.routes)
+            return (405, {'error': 'Method not allowed'}) if allowed else (404, {'error': 'Not found'})
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            return 503, {'error': 'Server busy, try again later'}
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+            return 200, await handler(parse_qs(url.query), body)
+        except json.JSONDecodeError:
+            return 400, {'error': 'Request body must be JSON'}
+        except HTTPError as e:
+            return e.status, {'error': e.message}
+        except DatabaseBusyError:
+            return 503, {'error': 'Database busy, try again later'}
+        except DatabaseError as e:
+            print(f"Database error handling {method} {url.path}: {e}")
+            return 500, {'error': 'Database error'}
+        except Exception as e:
+            print(f"Error handling {method} {url.path}: {e}")
+            return 500, {'error': 'Internal server error'}
+        finally:
+            self._slots.release()
+
+    async def _read_request(self, reader):
+        """Parse one HTTP/1.1 request; returns None at end of stream"""
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, 'Malformed request line')
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HTTPError(400, 'Invalid Content-Length')
+        if length < 0 or length > self.MAX_BODY:
+            raise HTTPError(413, 'Request body too large')
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    def _write_response(self, writer, status, payload, keep_alive):
+        if isinstance(payload, RawResponse):
+            data, content_type = payload.body.encode('utf-8'), payload.content_type
+        else:
+            data, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + data)
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        """Start listening and serve until cancelled"""
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Health service listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        """Flush pending diagnoses and stop worker threads"""
+        self.writer.close()
+        self.async_database.close()
+        self.executor.shutdown(wait=True)
+
+def _int_param(query, name, default, low, high):
+    try:
+        value = int(query.get(name, [default])[0])
+    except ValueError:
+        raise HTTPError(400, f"'{name}' must be an integer")
+    return max(low, min(high, value))
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Health Assistant HTTP service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-concurrency', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--metrics', action='store_true', help="collect latency and counter metrics for /metrics")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+
+    service = HealthService(max_concurrency=args.max_concurrency, workers=args.workers)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
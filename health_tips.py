@@ -1,67 +1,93 @@
-import tempfile
 import webbrowser
 import os
-import sqlite3
+import time
+from cache import LRUCache
+from instrumentation import metrics
 from database import HealthDatabase
+from tip_renderer import TipPageRenderer
 
 class HealthTips:
-    def __init__(self):
-        self.database = HealthDatabase()
+    def __init__(self, database=None, cache_size=256, version_check_interval=5.0, renderer=None):
+        self.database = database or HealthDatabase()
+        self.renderer = renderer or TipPageRenderer()
+        
+        # Tips rarely change: cache them until the health_tips version stamp moves
+        self.cache = LRUCache(cache_size, name='tips')
+        self.version_check_interval = version_check_interval
+        self._tips_version = None
+        self._version_checked_at = None
+    
+    def _cached(self, key, loader, raise_errors=False):
+        """Return tips for key from the cache, loading them on a miss
+        
+        Loaders raise on database errors, so a failed load is never cached:
+        it returns no tips (or re-raises with raise_errors) and the next call
+        tries the database again.
+        """
+        self._check_tips_version()
+        try:
+            return list(self.cache.get_or_load(key, lambda: tuple(loader())))
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Error getting tips: {e}")
+            return []
+    
+    def _category_tips(self, category, raise_errors=False):
+        return self._cached(('category', category), lambda: self.database._tips_by_category(category), raise_errors)
+    
+    def _check_tips_version(self):
+        """Drop cached tips if the health_tips table changed since the last check"""
+        now = time.monotonic()
+        if self._version_checked_at is not None and now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        version = self.database.get_table_version('health_tips')
+        if version is None or version != self._tips_version:
+            self.cache.clear()
+            self._tips_version = version
+    
+    def invalidate_cache(self):
+        """Forget all cached tips immediately"""
+        self.cache.clear()
+        self._version_checked_at = None
+    
+    def cache_stats(self):
+        """Return tip cache hit/miss counters"""
+        return self.cache.stats()
     
     def get_general_tips(self):
         """Get general health tips from database"""
-        return self.database.get_tips_by_category('general')
+        return self._category_tips('general')
     
     def get_nutrition_tips(self):
         """Get nutrition tips from database"""
-        return self.database.get_tips_by_category('nutrition')
+        return self._category_tips('nutrition')
     
     def get_mental_health_tips(self):
         """Get mental health tips from database"""
-        return self.database.get_tips_by_category('mental_health')
+        return self._category_tips('mental_health')
     
     def get_disease_specific_tips(self, condition):
         """Get tips specific to a medical condition"""
-        try:
-            # Normalize condition name for better matching
-            condition_normalized = condition.lower().replace(' ', '_')
-            
-            with sqlite3.connect(self.database.db_path) as conn:
-                cursor = conn.cursor()
-                # Try multiple search patterns for better matching
-                cursor.execute('''
-                    SELECT tip_text FROM health_tips 
-                    WHERE condition_related = ? 
-                       OR condition_related = ?
-                       OR condition_related LIKE ?
-                       OR condition_related LIKE ?
-                    ORDER BY category
-                ''', (condition, condition_normalized, f'%{condition}%', f'%{condition_normalized}%'))
-                
-                results = [tip[0] for tip in cursor.fetchall()]
-                
-                # If no specific tips found, try partial matching with key words
-                if not results:
-                    key_words = ['uti', 'infection', 'arthritis', 'diabetes', 'anxiety', 'depression', 'hypertension', 'heart']
-                    for word in key_words:
-                        if word in condition_normalized:
-                            cursor.execute('''
-                                SELECT tip_text FROM health_tips 
-                                WHERE condition_related LIKE ?
-                            ''', (f'%{word}%',))
-                            results.extend([tip[0] for tip in cursor.fetchall()])
-                            break
-                
-                return results
-        except Exception as e:
-            print(f"Error getting disease tips: {e}")
-            return []
+        return self._condition_tips(condition)
+    
+    def _condition_tips(self, condition, raise_errors=False):
+        return self._cached(('condition', condition), lambda: self.database._search_tips(condition), raise_errors)
     
     def get_personalized_tips(self, recent_diagnoses=None):
         """Get personalized tips based on recent diagnoses"""
         if not recent_diagnoses:
             return self.get_general_tips()
         
+        key = ('personalized', tuple(recent_diagnoses[:3]))
+        return self._cached(key, lambda: self._build_personalized_tips(recent_diagnoses))
+    
+    def _build_personalized_tips(self, recent_diagnoses):
+        """Combine disease-specific and general tips for recent diagnoses
+        
+        Lookups raise on failure so an incomplete list isn't cached.
+        """
         personalized_tips = []
         
         # Get disease-specific tips for each diagnosis
@@ -74,13 +100,13 @@ class HealthTips:
             ]
             
             for condition in condition_formats:
-                disease_tips = self.get_disease_specific_tips(condition)
+                disease_tips = self._condition_tips(condition, raise_errors=True)
                 if disease_tips:
                     personalized_tips.extend(disease_tips[:2])  # Top 2 tips per condition
                     break  # Found tips, no need to try other formats
         
         # Add some general tips to fill up
-        general_tips = self.get_general_tips()
+        general_tips = self._category_tips('general', raise_errors=True)
         personalized_tips.extend(general_tips[:max(3, 8-len(personalized_tips))])
         
         # Remove duplicates while preserving order
@@ -95,7 +121,7 @@ class HealthTips:
     
     def get_all_tips_by_category(self):
         """Get all tips organized by category"""
-        all_tips = self.database.get_all_tips()
+        all_tips = self._cached(('all',), self.database._all_tips)
         organized = {}
         for category, tip_text in all_tips:
             if category not in organized:
@@ -103,67 +129,31 @@ class HealthTips:
             organized[category].append(tip_text)
         return organized
 
+    def render_tips_html(self, tips, title="Health Tips"):
+        """Render a tips page to an HTML string without touching the filesystem"""
+        return self.renderer.render(tips, title)
+
+    @metrics.timed('tips.show_in_browser')
     def show_tips_in_browser(self, tips, title="Health Tips"):
         """Display tips in a web browser"""
         if not tips:  # If no tips provided, get general tips
             tips = self.get_general_tips()
             title = "General Health Tips"
             
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>{title}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f0f8ff; }}
-                h1 {{ color: #2c3e50; text-align: center; }}
-                .tip {{ background: white; padding: 15px; margin: 10px 0; border-radius: 8px; 
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-                .tip-number {{ color: #3498db; font-weight: bold; }}
-                .personalized {{ border-left: 4px solid #e74c3c; }}
-                .general {{ border-left: 4px solid #3498db; }}
-            </style>
-        </head>
-        <body>
-            <h1>{title}</h1>
-        """
-        
-        for i, tip in enumerate(tips, 1):
-            tip_class = "personalized" if "Based on" in title else "general"
-            html_content += f'<div class="tip {tip_class}"><span class="tip-number">{i}.</span> {tip}</div>'
-        
-        html_content += """
-            <div style="text-align: center; margin-top: 30px; color: #7f8c8d;">
-                <p>Remember: These are general tips. Always consult healthcare professionals for personalized advice!</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Create temporary file and open in browser
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as f:
-            f.write(html_content)
-            temp_file = f.name
+        page_path = self.renderer.render_to_file(tips, title)
         
         try:
-            webbrowser.open('file://' + temp_file)
+            webbrowser.open('file://' + page_path)
         except Exception as e:
             print(f"Could not open browser: {e}")
         
-        return temp_file
+        return page_path
 
     def show_smart_tips(self):
         """Smart method that automatically shows personalized or general tips"""
         try:
             # Try to get recent diagnoses from database
-            with sqlite3.connect(self.database.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT diagnosis FROM diagnoses 
-                    ORDER BY created_at DESC 
-                    LIMIT 3
-                ''')
-                recent_diagnoses = [row[0].lower().replace(' ', '_') for row in cursor.fetchall()]
+            recent_diagnoses = [d.lower().replace(' ', '_') for d in self.database.get_recent_diagnoses(3)]
             
             if recent_diagnoses:
                 # Show personalized tips
@@ -0,0 +1,195 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Latency bucket upper bounds in seconds (Prometheus-style cumulative histogram)
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, q):
+        """Upper bucket bound containing the q-th percentile (0-100)"""
+        if not self.count:
+            return 0.0
+        rank, seen = q / 100 * self.count, 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return BUCKETS[-1]
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum_seconds': self.total,
+            'mean_seconds': self.total / self.count if self.count else 0.0,
+            'p50_seconds': self.percentile(50),
+            'p95_seconds': self.percentile(95),
+            'p99_seconds': self.percentile(99),
+        }
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'started')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+class Metrics:
+    """Process-wide latency histograms and counters; every call is a no-op while disabled"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def observe(self, name, seconds):
+        """Record one latency sample for an operation"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def incr(self, name, amount=1):
+        """Increase a counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def timer(self, name):
+        """Context manager timing the enclosed block"""
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def timed(self, name):
+        """Decorator timing every call of a function"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """All metrics as plain data"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'operations': {name: h.snapshot() for name, h in sorted(self._histograms.items())},
+                'counters': dict(sorted(self._counters.items())),
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix='health_assistant'):
+        """Metrics in the Prometheus text exposition format"""
+        lines = [f'# HELP {prefix}_operation_seconds Latency of instrumented operations',
+                 f'# TYPE {prefix}_operation_seconds histogram']
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS, histogram.counts):
+                    cumulative += n
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{prefix}_operation_seconds_bucket{{operation="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'{prefix}_operation_seconds_sum{{operation="{name}"}} {histogram.total}')
+                lines.append(f'{prefix}_operation_seconds_count{{operation="{name}"}} {histogram.count}')
+            lines.append(f'# HELP {prefix}_events_total Instrumented event counters')
+            lines.append(f'# TYPE {prefix}_events_total counter')
+            for name, value in sorted(self._counters.items()):
+                lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+# Shared registry; set HEALTH_ASSISTANT_METRICS=1 to collect from startup
+metrics = Metrics(enabled=os.environ.get('HEALTH_ASSISTANT_METRICS') == '1')
+
+@contextmanager
+def profile(path=None, trace_memory=True, top=25):
+    """Capture a cProfile (and optionally tracemalloc) profile of the enclosed block
+
+    Yields a dict that is filled in on exit with 'cpu' (pstats text) and,
+    when tracing memory, 'memory' (top allocation sites) and 'peak_bytes'.
+    If path is given the raw cProfile data is also written there.
+    """
+    report = {}
+    profiler = cProfile.Profile()
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler.enable()
+    try:
+        yield report
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(top)
+        report['cpu'] = out.getvalue()
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            report['memory'] = [str(stat) for stat in snapshot.statistics('lineno')[:top]]
+            report['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
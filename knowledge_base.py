@@ -0,0 +1,97 @@
+import functools
+import json
+import os
+import re
+import threading
+from types import MappingProxyType
+
+from symptom_bitset import SymptomBitset, IllnessMatrix
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge_base.json")
+
+_SEPARATORS = re.compile(r"[\s\-_/]+")
+
+def symptom_key(text):
+    """Canonical lookup key for free text: lowercase words joined by underscores"""
+    return _SEPARATORS.sub('_', text.strip().lower()).strip('_')
+
+class KnowledgeBase:
+    """Symptom vocabulary, illness definitions and aliases with indexes compiled at load time
+
+    Instances are treated as immutable: collections are exposed as tuples
+    and read-only mappings so one instance can be shared by every component
+    and thread. Use get_knowledge_base() rather than constructing one per
+    component.
+    """
+
+    def __init__(self, symptoms, illnesses, aliases=None, version=1):
+        self.version = version
+        self.symptoms = tuple(symptoms)
+        self.bitset = SymptomBitset(self.symptoms)
+        if len(self.bitset.index) != len(self.symptoms):
+            raise ValueError("Duplicate symptom in knowledge base")
+        self.symptom_ids = MappingProxyType(self.bitset.index)
+
+        compiled = {}
+        for name, illness_symptoms in illnesses.items():
+            unknown = [s for s in illness_symptoms if s not in self.bitset.index]
+            if unknown:
+                raise ValueError(f"Illness '{name}' uses unknown symptoms: {', '.join(unknown)}")
+            compiled[name] = tuple(illness_symptoms)
+        self.illnesses = MappingProxyType(compiled)
+        self.illness_masks = MappingProxyType(
+            {name: self.bitset.encode(symptoms) for name, symptoms in compiled.items()}
+        )
+
+        # Free-text lookups: canonical names plus aliases, all keyed by symptom_key()
+        lookup = {symptom_key(symptom): symptom for symptom in self.symptoms}
+        for alias, symptom in (aliases or {}).items():
+            if symptom not in self.bitset.index:
+                raise ValueError(f"Alias '{alias}' points to unknown symptom '{symptom}'")
+            lookup.setdefault(symptom_key(alias), symptom)
+        self.aliases = MappingProxyType(lookup)
+
+        self._matrix = None
+        self._matrix_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """Read and compile a knowledge base JSON file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['symptoms'], data['illnesses'], data.get('aliases'), data.get('version', 1))
+
+    @property
+    def illness_matrix(self):
+        """Vectorized illness masks (needs NumPy, so built on first use)"""
+        if self._matrix is None:
+            with self._matrix_lock:
+                if self._matrix is None:
+                    self._matrix = IllnessMatrix(self.bitset, self.illnesses)
+        return self._matrix
+
+    def normalize_symptom(self, text):
+        """Map a symptom name, spelling variant or alias to its canonical name, or None"""
+        return self.aliases.get(symptom_key(text))
+
+    def normalize_symptoms(self, texts):
+        """Canonical names of the recognised entries, each once, in first-seen order
+
+        Aliases can map different inputs ("Fever", "High Temperature") to the
+        same symptom, so duplicates are dropped.
+        """
+        lookup = self.aliases
+        canonical = (lookup.get(symptom_key(text)) for text in texts)
+        return list(dict.fromkeys(symptom for symptom in canonical if symptom))
+
+    def training_inputs(self):
+        """Symptoms and illnesses as plain JSON data (what trained models are hashed on)"""
+        return list(self.symptoms), {name: list(symptoms) for name, symptoms in self.illnesses.items()}
+
+@functools.lru_cache(maxsize=None)
+def _load_shared(path):
+    return KnowledgeBase.load(path)
+
+def get_knowledge_base(path=None):
+    """Return the shared knowledge base for a data file, loading it once per process"""
+    return _load_shared(os.path.abspath(path or DEFAULT_PATH))
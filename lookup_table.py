@@ -0,0 +1,114 @@
+import itertools
+import json
+import os
+from math import comb
+
+import numpy as np
+
+class DiagnosisLookupTable:
+    """Precomputed top-3 diagnoses for every symptom set of up to max_size symptoms
+
+    Rows are stored in a memory-mapped .npy file. A symptom set's row is its
+    combinatorial (colex) rank, so a lookup costs O(k) arithmetic and one
+    row read. A JSON sidecar records the model hash the table was built from.
+    """
+
+    TOP_K = 3
+    DTYPE = np.dtype([('label', '<i2', (TOP_K,)), ('confidence', '<f8', (TOP_K,)), ('matches', 'u1', (TOP_K,))])
+
+    def __init__(self, path, vocabulary, max_size=4):
+        self.path = path
+        self.data_path = f"{path}.npy"
+        self.meta_path = f"{path}.json"
+        self.vocabulary = list(vocabulary)
+        self.index = {symptom: bit for bit, symptom in enumerate(self.vocabulary)}
+        self.max_size = max_size
+        self.labels = []
+        self.rows = None
+
+        n = len(self.vocabulary)
+        self._binomial = [[comb(value, k) for k in range(max_size + 1)] for value in range(n + 1)]
+        # First row of each set size; sizes run from 1 to max_size
+        self._offsets = [0, 0]
+        for k in range(1, max_size + 1):
+            self._offsets.append(self._offsets[-1] + comb(n, k))
+        self.size = self._offsets[-1]
+
+    def row_for(self, bits):
+        """Row number of a sorted tuple of distinct symptom bits"""
+        return self._offsets[len(bits)] + sum(self._binomial[bit][i] for i, bit in enumerate(bits, 1))
+
+    def load(self, model_hash):
+        """Memory-map the stored table if it was built for this model; returns True on success"""
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if (meta.get('model_hash') != model_hash or meta.get('max_size') != self.max_size
+                    or meta.get('vocabulary') != self.vocabulary or meta.get('rows') != self.size):
+                return False
+            rows = np.load(self.data_path, mmap_mode='r')
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Error loading diagnosis lookup table: {e}")
+            return False
+        if rows.dtype != self.DTYPE or rows.shape != (self.size,):
+            return False
+        self.labels = meta['labels']
+        self.rows = rows
+        return True
+
+    def build(self, engine, chunk_size=20000):
+        """Score every symptom set up to max_size with the engine's model and store the results"""
+        labels = [c.replace('_', ' ').title() for c in engine.clf.classes_]
+        label_ids = {label: i for i, label in enumerate(labels)}
+
+        tmp_data = f"{self.data_path}.tmp"
+        rows = np.lib.format.open_memmap(tmp_data, mode='w+', dtype=self.DTYPE, shape=(self.size,))
+        rows['label'] = -1
+        for k in range(1, self.max_size + 1):
+            combos = itertools.combinations(range(len(self.vocabulary)), k)
+            while True:
+                chunk = list(itertools.islice(combos, chunk_size))
+                if not chunk:
+                    break
+                symptom_lists = [[self.vocabulary[bit] for bit in bits] for bits in chunk]
+                results = engine.analyze_batch(symptom_lists, use_cache=False)
+                for bits, diagnoses in zip(chunk, results):
+                    row = rows[self.row_for(bits)]
+                    for slot, diagnosis in enumerate(diagnoses):
+                        row['label'][slot] = label_ids[diagnosis['name']]
+                        row['confidence'][slot] = diagnosis['confidence']
+                        row['matches'][slot] = diagnosis['symptoms_match']
+        rows.flush()
+        del rows
+
+        meta = {'model_hash': engine.model_hash, 'max_size': self.max_size,
+                'vocabulary': self.vocabulary, 'labels': labels, 'rows': self.size}
+        tmp_meta = f"{self.meta_path}.tmp"
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        # Data first, then the sidecar that marks it as valid for this model
+        os.replace(tmp_data, self.data_path)
+        os.replace(tmp_meta, self.meta_path)
+        return self.load(engine.model_hash)
+
+    def lookup(self, symptoms):
+        """Return precomputed diagnoses, or None if the set is not covered by the table"""
+        if self.rows is None:
+            return None
+        bits = sorted({self.index[s] for s in symptoms if s in self.index})
+        if not bits or len(bits) > self.max_size:
+            return None
+
+        row = self.rows[self.row_for(bits)]
+        results = []
+        for label, confidence, matches in zip(row['label'], row['confidence'], row['matches']):
+            if label < 0:
+                break
+            results.append({
+                'name': self.labels[label],
+                'confidence': confidence,
+                'symptoms_match': int(matches)
+            })
+        return results
@@ -0,0 +1,54 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+class ModelStore:
+    """Persist trained models on disk, keyed by a hash of the data they were trained on"""
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory=None, name="diagnostic_model"):
+        """Initialize the store location"""
+        self.directory = directory or os.path.dirname(os.path.abspath(__file__))
+        self.name = name
+        self.path = os.path.join(self.directory, f"{name}.pkl")
+
+    @staticmethod
+    def content_hash(*parts):
+        """Return a stable hash of JSON-serializable training inputs"""
+        payload = json.dumps(parts, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def load(self, expected_hash):
+        """Load the stored artifact if its hash matches, otherwise return None"""
+        try:
+            with open(self.path, 'rb') as f:
+                artifact = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading model artifact: {e}")
+            return None
+
+        if artifact.get('format_version') != self.FORMAT_VERSION or artifact.get('hash') != expected_hash:
+            return None
+        return artifact
+
+    def save(self, content_hash, **payload):
+        """Atomically write an artifact with its content hash"""
+        artifact = dict(payload, hash=content_hash, format_version=self.FORMAT_VERSION)
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{self.name}-", suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            print(f"Error saving model artifact: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
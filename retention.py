@@ -0,0 +1,251 @@
+import argparse
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+from database import HealthDatabase, HistoryRecord
+
+ARCHIVE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS {schema}.diagnoses (
+        id INTEGER PRIMARY KEY,
+        date TEXT,
+        symptoms TEXT,
+        diagnosis TEXT,
+        confidence REAL,
+        created_at TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS {schema}.idx_diagnoses_created_at ON diagnoses(created_at);
+'''
+
+COLUMNS = 'id, date, symptoms, diagnosis, confidence, created_at'
+
+class RetentionManager:
+    """Move old diagnoses into per-month archive databases and keep the hot database compact
+
+    Rows older than max_age_days are copied to archive/diagnoses-YYYY-MM.db
+    and deleted from the main database in batches. Each batch commits the
+    INSERT OR IGNORE copy to the archive before a separate transaction
+    deletes the rows from the main database, so an interrupted run is
+    simply repeated. The statistics summary tables are cumulative and untouched,
+    so totals and top diagnoses still include archived cases. Freed pages
+    are returned to the filesystem with incremental vacuum.
+    """
+
+    def __init__(self, database, max_age_days=365, archive_dir=None, batch_size=5000, vacuum_pages=2000):
+        self.database = database
+        self.max_age_days = max_age_days
+        self.archive_dir = archive_dir or os.path.join(os.path.dirname(database.db_path), "archive")
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def cutoff(self):
+        """created_at value before which rows are archived"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.max_age_days)
+        return cutoff.strftime("%Y-%m-%d %H:%M:%S")
+
+    def archive_path(self, month):
+        return os.path.join(self.archive_dir, f"diagnoses-{month}.db")
+
+    def archive(self, cutoff=None):
+        """Archive every row created before cutoff; returns {month: rows moved}"""
+        cutoff = cutoff or self.cutoff()
+        with self._lock:
+            conn = self.database.connection()
+            months = [row[0] for row in conn.execute('''
+                SELECT DISTINCT substr(created_at, 1, 7) FROM diagnoses
+                WHERE created_at < ? ORDER BY 1
+            ''', (cutoff,))]
+            return {month: self._archive_month(conn, month, cutoff) for month in months}
+
+    def _archive_month(self, conn, month, cutoff):
+        start, end = f"{month}-01", min(_next_month(month), cutoff)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute('ATTACH DATABASE ? AS archive', (self.archive_path(month),))
+        moved = 0
+        try:
+            # The copy must be durable before the matching rows leave the main database
+            conn.execute('PRAGMA archive.synchronous = FULL')
+            for statement in ARCHIVE_SCHEMA.format(schema='archive').split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.commit()
+            # Page through the month in id order: each batch is a rowid range starting
+            # where the previous one ended, so no batch re-reads or re-sorts earlier rows.
+            # The unary + keeps SQLite on the primary key instead of the created_at index.
+            in_month = '+created_at >= ? AND +created_at < ?'
+            after, last_id = conn.execute('''
+                SELECT min(id) - 1, max(id) FROM main.diagnoses WHERE created_at >= ? AND created_at < ?
+            ''', (start, end)).fetchone()
+            while last_id is not None:
+                upper = conn.execute(f'''
+                    SELECT max(id) FROM (
+                        SELECT id FROM main.diagnoses WHERE id > ? AND id <= ? AND {in_month}
+                        ORDER BY id LIMIT ?
+                    )
+                ''', (after, last_id, start, end, self.batch_size)).fetchone()[0]
+                if upper is None:
+                    break
+                where = f'id > ? AND id <= ? AND {in_month}'
+                params = (after, upper, start, end)
+                # Two separate transactions: with the main database in WAL mode a
+                # transaction spanning both files isn't atomic, so a crash could keep
+                # the delete and lose the copy. Copy first (idempotent), then delete
+                # only rows the archive holds.
+                with conn:
+                    conn.execute(f'''
+                        INSERT OR IGNORE INTO archive.diagnoses ({COLUMNS})
+                        SELECT {COLUMNS} FROM main.diagnoses WHERE {where}
+                    ''', params)
+                with conn:
+                    count = conn.execute(f'''
+                        DELETE FROM main.diagnoses
+                        WHERE {where} AND EXISTS (SELECT 1 FROM archive.diagnoses AS a WHERE a.id = diagnoses.id)
+                    ''', params).rowcount
+                    conn.execute('''
+                        INSERT INTO diagnosis_archives (month, path, rows, archived_at)
+                        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                        ON CONFLICT(month) DO UPDATE SET rows = rows + excluded.rows,
+                                                         archived_at = excluded.archived_at
+                    ''', (month, self.archive_path(month), count))
+                moved += count
+                after = upper
+        finally:
+            conn.execute('DETACH DATABASE archive')
+        return moved
+
+    def ensure_incremental_vacuum(self):
+        """Switch a database created without auto_vacuum to incremental mode (rewrites the file once)"""
+        conn = self.database.connection()
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+            return False
+        with self._lock:
+            if conn.in_transaction:
+                conn.commit()
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            # VACUUM can't run inside a transaction
+            conn.execute('VACUUM')
+        return True
+
+    def vacuum(self, pages=None):
+        """Release up to `pages` free pages back to the filesystem; returns pages released"""
+        conn = self.database.connection()
+        free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if not free:
+            return 0
+        pages = min(free, pages or self.vacuum_pages)
+        # incremental_vacuum only does its work while the result rows are stepped through
+        conn.execute(f'PRAGMA incremental_vacuum({int(pages)})').fetchall()
+        if conn.in_transaction:
+            conn.commit()
+        return free - conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+    def run_once(self):
+        """Archive expired rows and reclaim the space they used"""
+        moved = self.archive()
+        released = 0
+        while True:
+            step = self.vacuum()
+            released += step
+            if not step or self._stop.is_set():
+                break
+        if released:
+            # Under WAL the file only shrinks once the freed pages are checkpointed
+            self.database.connection().execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+        return moved, released
+
+    def start(self, interval=3600.0):
+        """Archive and vacuum in the background every interval seconds until stop() is called"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            try:
+                self.ensure_incremental_vacuum()
+            except Exception as e:
+                print(f"Error enabling incremental vacuum: {e}")
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    print(f"Error archiving diagnoses: {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, name="RetentionManager", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    # Reading archived history
+
+    def archived_months(self):
+        """(month, path, rows) for every archive, newest first"""
+        return self.database.connection().execute('''
+            SELECT month, path, rows FROM diagnosis_archives ORDER BY month DESC
+        ''').fetchall()
+
+    def iter_archived_history(self, start=None, end=None, diagnosis=None):
+        """Yield archived HistoryRecords newest first, opening only the months in range"""
+        for month, path, _ in self.archived_months():
+            if (end and f"{month}-01" >= end) or (start and _next_month(month) <= start):
+                continue
+            if not os.path.exists(path):
+                continue
+            clauses, params = [], []
+            if start:
+                clauses.append('created_at >= ?')
+                params.append(start)
+            if end:
+                clauses.append('created_at < ?')
+                params.append(end)
+            if diagnosis:
+                clauses.append('diagnosis = ?')
+                params.append(diagnosis)
+            where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                for row in conn.execute(f'''
+                    SELECT {COLUMNS} FROM diagnoses {where}
+                    ORDER BY created_at DESC, id DESC
+                ''', params):
+                    yield HistoryRecord(*row)
+            finally:
+                conn.close()
+
+    def iter_history(self, start=None, end=None, diagnosis=None):
+        """Yield history from the live database followed by the archives, newest first"""
+        yield from self.database.iter_diagnosis_history(start, end, diagnosis)
+        yield from self.iter_archived_history(start, end, diagnosis)
+
+def _next_month(month):
+    """'2024-12' -> '2025-01-01'"""
+    year, month = int(month[:4]), int(month[5:7])
+    return f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old diagnoses and compact the database")
+    parser.add_argument('--database', default="health_data.db")
+    parser.add_argument('--max-age-days', type=int, default=365)
+    parser.add_argument('--archive-dir')
+    args = parser.parse_args()
+
+    database = HealthDatabase(args.database)
+    retention = RetentionManager(database, args.max_age_days, args.archive_dir)
+    if retention.ensure_incremental_vacuum():
+        print("Enabled incremental vacuum")
+    moved, released = retention.run_once()
+    for month, rows in moved.items():
+        print(f"Archived {rows} diagnoses from {month}")
+    print(f"Released {released} free pages; database is now {os.path.getsize(database.db_path)} bytes")
+
+if __name__ == "__main__":
+    main()
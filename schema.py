@@ -0,0 +1,209 @@
+import sqlite3
+
+def _create_tip_search_index(conn):
+    """Build an FTS5 index over health_tips, if this SQLite build has FTS5"""
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS health_tips_fts USING fts5(
+                condition_related, tip_text, content='health_tips', content_rowid='id'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"Full-text tip search unavailable, using LIKE matching: {e}")
+        return
+    for statement in _split_statements('''
+        CREATE TRIGGER IF NOT EXISTS trg_health_tips_fts_insert AFTER INSERT ON health_tips
+        BEGIN
+            INSERT INTO health_tips_fts (rowid, condition_related, tip_text)
+                VALUES (NEW.id, NEW.condition_related, NEW.tip_text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_health_tips_fts_delete AFTER DELETE ON health_tips
+        BEGIN
+            INSERT INTO health_tips_fts (health_tips_fts, rowid, condition_related, tip_text)
+                VALUES ('delete', OLD.id, OLD.condition_related, OLD.tip_text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_health_tips_fts_update AFTER UPDATE ON health_tips
+        BEGIN
+            INSERT INTO health_tips_fts (health_tips_fts, rowid, condition_related, tip_text)
+                VALUES ('delete', OLD.id, OLD.condition_related, OLD.tip_text);
+            INSERT INTO health_tips_fts (rowid, condition_related, tip_text)
+                VALUES (NEW.id, NEW.condition_related, NEW.tip_text);
+        END;
+        INSERT INTO health_tips_fts (health_tips_fts) VALUES ('rebuild');
+    '''):
+        conn.execute(statement)
+
+# Ordered schema migrations; each entry is (version, description, SQL script or callable(conn)).
+# The database records the last applied version in PRAGMA user_version.
+MIGRATIONS = [
+    (1, "create tables", '''
+        CREATE TABLE IF NOT EXISTS diagnoses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            symptoms TEXT NOT NULL,
+            diagnosis TEXT NOT NULL,
+            confidence REAL NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS health_tips (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT NOT NULL,
+            tip_text TEXT NOT NULL,
+            condition_related TEXT
+        );
+    '''),
+    (2, "index history, stats and tip lookups", '''
+        CREATE INDEX IF NOT EXISTS idx_diagnoses_created_at ON diagnoses(created_at);
+        CREATE INDEX IF NOT EXISTS idx_diagnoses_diagnosis ON diagnoses(diagnosis);
+        CREATE INDEX IF NOT EXISTS idx_health_tips_category ON health_tips(category);
+        CREATE INDEX IF NOT EXISTS idx_health_tips_condition_related ON health_tips(condition_related);
+    '''),
+    (3, "incrementally maintained diagnosis statistics", '''
+        CREATE TABLE IF NOT EXISTS diagnosis_counts (
+            diagnosis TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0,
+            last_seen TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_diagnosis_counts_count ON diagnosis_counts(count);
+        CREATE TABLE IF NOT EXISTS diagnosis_daily (
+            day TEXT NOT NULL,
+            diagnosis TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, diagnosis)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS diagnosis_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total INTEGER NOT NULL DEFAULT 0
+        );
+
+        INSERT OR REPLACE INTO diagnosis_counts (diagnosis, count, last_seen)
+            SELECT diagnosis, COUNT(*), MAX(created_at) FROM diagnoses GROUP BY diagnosis;
+        INSERT OR REPLACE INTO diagnosis_daily (day, diagnosis, count)
+            SELECT COALESCE(date(created_at), date('now')), diagnosis, COUNT(*) FROM diagnoses
+            GROUP BY 1, diagnosis;
+        INSERT OR REPLACE INTO diagnosis_totals (id, total) SELECT 1, COUNT(*) FROM diagnoses;
+
+        CREATE TRIGGER IF NOT EXISTS trg_diagnoses_stats_insert AFTER INSERT ON diagnoses
+        BEGIN
+            INSERT INTO diagnosis_counts (diagnosis, count, last_seen)
+                VALUES (NEW.diagnosis, 1, NEW.created_at)
+                ON CONFLICT(diagnosis) DO UPDATE SET count = count + 1, last_seen = NEW.created_at;
+            INSERT INTO diagnosis_daily (day, diagnosis, count)
+                VALUES (COALESCE(date(NEW.created_at), date('now')), NEW.diagnosis, 1)
+                ON CONFLICT(day, diagnosis) DO UPDATE SET count = count + 1;
+            UPDATE diagnosis_totals SET total = total + 1 WHERE id = 1;
+        END;
+    '''),
+    (4, "full-text index over health tips", _create_tip_search_index),
+    (5, "version stamp for cache invalidation", '''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO table_versions (name, version) VALUES ('health_tips', 0);
+        CREATE TRIGGER IF NOT EXISTS trg_health_tips_version_insert AFTER INSERT ON health_tips
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE name = 'health_tips';
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_health_tips_version_update AFTER UPDATE ON health_tips
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE name = 'health_tips';
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_health_tips_version_delete AFTER DELETE ON health_tips
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE name = 'health_tips';
+        END;
+    '''),
+    (6, "index filtered history pages", '''
+        CREATE INDEX IF NOT EXISTS idx_diagnoses_diagnosis_created_at ON diagnoses(diagnosis, created_at);
+        -- The composite index also serves lookups and grouping by diagnosis alone
+        DROP INDEX IF EXISTS idx_diagnoses_diagnosis;
+    '''),
+    (7, "resumable bulk import checkpoints", '''
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source TEXT PRIMARY KEY,
+            rows_done INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP
+        );
+    '''),
+    (8, "registry of monthly diagnosis archives", '''
+        CREATE TABLE IF NOT EXISTS diagnosis_archives (
+            month TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            rows INTEGER NOT NULL DEFAULT 0,
+            archived_at TIMESTAMP
+        );
+    '''),
+    (9, "count rows with a missing or unparseable created_at under today", '''
+        -- date() of such a value is NULL, which diagnosis_daily.day rejects
+        DROP TRIGGER IF EXISTS trg_diagnoses_stats_insert;
+        CREATE TRIGGER trg_diagnoses_stats_insert AFTER INSERT ON diagnoses
+        BEGIN
+            INSERT INTO diagnosis_counts (diagnosis, count, last_seen)
+                VALUES (NEW.diagnosis, 1, NEW.created_at)
+                ON CONFLICT(diagnosis) DO UPDATE SET count = count + 1, last_seen = NEW.created_at;
+            INSERT INTO diagnosis_daily (day, diagnosis, count)
+                VALUES (COALESCE(date(NEW.created_at), date('now')), NEW.diagnosis, 1)
+                ON CONFLICT(day, diagnosis) DO UPDATE SET count = count + 1;
+            UPDATE diagnosis_totals SET total = total + 1 WHERE id = 1;
+        END;
+    '''),
+]
+
+class SchemaManager:
+    """Create tables and indexes and apply versioned migrations"""
+
+    def __init__(self, conn, migrations=None):
+        self.conn = conn
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m[0])
+
+    @property
+    def latest_version(self):
+        return self.migrations[-1][0] if self.migrations else 0
+
+    def current_version(self):
+        """Return the schema version stored in the database"""
+        return self.conn.execute('PRAGMA user_version').fetchone()[0]
+
+    def migrate(self):
+        """Apply all pending migrations in order and return the resulting version"""
+        for version, description, step in self.migrations:
+            if version <= self.current_version():
+                continue
+            self._apply(version, description, step)
+        return self.current_version()
+
+    def _apply(self, version, description, step):
+        """Apply one migration atomically, skipping it if another process got there first"""
+        conn = self.conn
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                conn.execute('ROLLBACK')
+                return
+            if callable(step):
+                step(conn)
+            else:
+                for statement in _split_statements(step):
+                    conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+            conn.execute('COMMIT')
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise sqlite3.DatabaseError(f"Migration {version} ({description}) failed: {e}") from e
+
+def _split_statements(script):
+    """Split a migration script into complete SQL statements"""
+    statements, buffer = [], ''
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ''
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
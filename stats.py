@@ -0,0 +1,72 @@
+class DiagnosisStats:
+    """Read diagnosis statistics from summary tables kept current by triggers
+
+    Counters are cumulative: they grow with every saved diagnosis and are
+    not reduced when rows are removed from the diagnoses table. Call
+    rebuild() to recompute them from the rows that are currently stored.
+    """
+
+    def __init__(self, database):
+        self.database = database
+
+    def total(self):
+        """Total number of diagnoses recorded"""
+        row = self.database.connection().execute(
+            'SELECT total FROM diagnosis_totals WHERE id = 1'
+        ).fetchone()
+        return row[0] if row else 0
+
+    def top_diagnoses(self, k=5):
+        """Return the k most frequent diagnoses as (diagnosis, count) pairs"""
+        return self.database.connection().execute('''
+            SELECT diagnosis, count FROM diagnosis_counts
+            ORDER BY count DESC, diagnosis
+            LIMIT ?
+        ''', (k,)).fetchall()
+
+    def daily_counts(self, start_day=None, end_day=None, diagnosis=None):
+        """Return (day, total) pairs, optionally restricted to a day range or one diagnosis"""
+        clauses, params = [], []
+        if start_day:
+            clauses.append('day >= ?')
+            params.append(start_day)
+        if end_day:
+            clauses.append('day <= ?')
+            params.append(end_day)
+        if diagnosis:
+            clauses.append('diagnosis = ?')
+            params.append(diagnosis)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self.database.connection().execute(f'''
+            SELECT day, SUM(count) FROM diagnosis_daily {where}
+            GROUP BY day ORDER BY day
+        ''', params).fetchall()
+
+    def window_breakdown(self, start_day, end_day=None):
+        """Return per-diagnosis counts for a day range, most frequent first"""
+        end_day = end_day or '9999-12-31'
+        return self.database.connection().execute('''
+            SELECT diagnosis, SUM(count) AS total FROM diagnosis_daily
+            WHERE day BETWEEN ? AND ?
+            GROUP BY diagnosis ORDER BY total DESC, diagnosis
+        ''', (start_day, end_day)).fetchall()
+
+    def rebuild(self):
+        """Recompute all summary tables from the diagnoses table
+
+        Rows already moved to monthly archives by RetentionManager are no
+        longer counted afterwards.
+        """
+        with self.database.connection() as conn:
+            conn.execute('DELETE FROM diagnosis_counts')
+            conn.execute('DELETE FROM diagnosis_daily')
+            conn.execute('''
+                INSERT INTO diagnosis_counts (diagnosis, count, last_seen)
+                SELECT diagnosis, COUNT(*), MAX(created_at) FROM diagnoses GROUP BY diagnosis
+            ''')
+            conn.execute('''
+                INSERT INTO diagnosis_daily (day, diagnosis, count)
+                SELECT COALESCE(date(created_at), date('now')), diagnosis, COUNT(*) FROM diagnoses
+                GROUP BY 1, diagnosis
+            ''')
+            conn.execute('INSERT OR REPLACE INTO diagnosis_totals (id, total) SELECT 1, COUNT(*) FROM diagnoses')
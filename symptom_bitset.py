@@ -0,0 +1,95 @@
+# NumPy is imported inside the vectorized helpers only, so plain bitmask
+# encoding (used by SymptomChecker at startup) doesn't pay for it
+
+# Bits set in every possible byte value, for popcount on NumPy < 2.0
+_BYTE_POPCOUNT = None
+
+def popcount(mask):
+    """Number of symptoms in an integer bitmask"""
+    return bin(mask).count('1')
+
+def popcount_words(words):
+    """Row-wise popcount of a uint64 word matrix"""
+    global _BYTE_POPCOUNT
+    import numpy as np
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    if _BYTE_POPCOUNT is None:
+        _BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+    counts = _BYTE_POPCOUNT[words.view(np.uint8)]
+    return counts.reshape(words.shape[:-1] + (-1,)).sum(axis=-1, dtype=np.int64)
+
+class SymptomBitset:
+    """Encode symptom sets as integer bitmasks over a fixed vocabulary"""
+
+    def __init__(self, vocabulary):
+        self.vocabulary = tuple(vocabulary)
+        self.index = {symptom: bit for bit, symptom in enumerate(self.vocabulary)}
+        self.n_words = max(1, (len(self.vocabulary) + 63) // 64)
+
+    def __contains__(self, symptom):
+        return symptom in self.index
+
+    def encode(self, symptoms):
+        """Return the bitmask for a collection of symptoms (unknown names are ignored)"""
+        mask = 0
+        for symptom in symptoms:
+            bit = self.index.get(symptom)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def decode(self, mask):
+        """Return the symptoms in a bitmask, in vocabulary order"""
+        symptoms = []
+        while mask:
+            low = mask & -mask
+            symptoms.append(self.vocabulary[low.bit_length() - 1])
+            mask ^= low
+        return symptoms
+
+    def validate(self, symptoms):
+        """Keep only known symptoms, lowercased, in the order given"""
+        return [s.lower() for s in symptoms if s.lower() in self.index]
+
+    def to_words(self, mask):
+        """Split a bitmask into little-endian uint64 words"""
+        import numpy as np
+        return np.array([(mask >> (64 * i)) & 0xFFFFFFFFFFFFFFFF for i in range(self.n_words)],
+                        dtype=np.uint64)
+
+class IllnessMatrix:
+    """Illness symptom masks stored as a uint64 matrix for vectorized AND/popcount scoring"""
+
+    def __init__(self, bitset, illnesses):
+        import numpy as np
+        self.bitset = bitset
+        self.names = list(illnesses)
+        self.masks = {name: bitset.encode(symptoms) for name, symptoms in illnesses.items()}
+        self.words = np.stack([bitset.to_words(self.masks[name]) for name in self.names])
+        self.sizes = popcount_words(self.words)
+
+    def match_counts(self, mask):
+        """Number of the given symptoms each illness has"""
+        return popcount_words(self.words & self.bitset.to_words(mask))
+
+    def jaccard(self, mask):
+        """Jaccard similarity between the symptom set and every illness"""
+        import numpy as np
+        matches = self.match_counts(mask)
+        union = self.sizes + popcount(mask) - matches
+        return np.divide(matches, union, out=np.zeros(len(self.names)), where=union > 0)
+
+    def match_count(self, mask, illness):
+        """Shared symptoms between a bitmask and one illness"""
+        return popcount(mask & self.masks.get(illness, 0))
+
+    def rank(self, mask, top_k=3):
+        """Return up to top_k (illness, jaccard, matches) tuples, best first, deterministically"""
+        import numpy as np
+        matches = self.match_counts(mask)
+        scores = self.jaccard(mask)
+        # Highest score first; ties broken by more matches, then by illness order
+        order = np.lexsort((np.arange(len(self.names)), -matches, -scores))
+        return [(self.names[i], float(scores[i]), int(matches[i]))
+                for i in order[:top_k] if matches[i] > 0]
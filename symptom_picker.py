@@ -0,0 +1,156 @@
+import bisect
+import tkinter as tk
+from tkinter import messagebox
+
+class SymptomIndex:
+    """Word-prefix index over a symptom vocabulary for type-ahead filtering"""
+
+    def __init__(self, symptoms):
+        self.symptoms = list(symptoms)
+        self.ids = {symptom: i for i, symptom in enumerate(self.symptoms)}
+        self.labels = [s.replace('_', ' ').title() for s in self.symptoms]
+        # Sorted (word, symptom id) pairs; a prefix query is a bisect range
+        self._words = sorted((word, i) for i, label in enumerate(self.labels)
+                             for word in label.lower().split())
+        self._keys = [word for word, _ in self._words]
+
+    def search(self, query):
+        """Return ids of symptoms with a word starting with every query term, in vocabulary order"""
+        terms = query.lower().replace('_', ' ').split()
+        if not terms:
+            return list(range(len(self.symptoms)))
+
+        matches = None
+        for term in terms:
+            start = bisect.bisect_left(self._keys, term)
+            end = bisect.bisect_left(self._keys, term + '\uffff', lo=start)
+            ids = {i for _, i in self._words[start:end]}
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                return []
+        return sorted(matches)
+
+class SymptomPicker:
+    """Reusable, virtualized symptom selection dialog
+
+    Only as many checkbuttons as fit in the window are created. Scrolling
+    and filtering rebind those rows to different symptoms, so opening the
+    dialog costs the same however large the vocabulary is.
+    """
+
+    def __init__(self, parent, symptoms, on_save, visible_rows=20):
+        self.index = SymptomIndex(symptoms)
+        self.on_save = on_save
+        self.visible_rows = visible_rows
+        self.selected = set()
+        self.filtered = self.index.search('')
+        self.top = 0
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Select Symptoms")
+        self.window.geometry("450x600")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        tk.Label(self.window, text="Select your symptoms:", font=('Arial', 12, 'bold')).pack(pady=10)
+
+        self.query = tk.StringVar()
+        self.query.trace_add('write', lambda *_: self._apply_filter())
+        self.search_entry = tk.Entry(self.window, textvariable=self.query, font=('Arial', 10))
+        self.search_entry.pack(fill="x", padx=20)
+        self.search_entry.bind('<Return>', lambda e: self._toggle(0))
+        self.count_label = tk.Label(self.window, font=('Arial', 9), fg='gray')
+        self.count_label.pack(anchor='w', padx=20)
+
+        tk.Button(self.window, text="Save", bg='lightgreen', font=('Arial', 11, 'bold'),
+                  command=self.save).pack(side=tk.BOTTOM, pady=10)
+
+        list_frame = tk.Frame(self.window)
+        list_frame.pack(fill="both", expand=True, padx=20, pady=(5, 0))
+        self.scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        rows_frame = tk.Frame(list_frame)
+        rows_frame.pack(side="left", fill="both", expand=True)
+
+        self.row_vars = []
+        self.row_buttons = []
+        for row in range(visible_rows):
+            var = tk.BooleanVar()
+            button = tk.Checkbutton(rows_frame, variable=var, anchor='w', font=('Arial', 10),
+                                    command=lambda row=row: self._toggle(row))
+            button.pack(fill="x", padx=20, pady=2)
+            self.row_vars.append(var)
+            self.row_buttons.append(button)
+
+        for widget in [self.window, rows_frame] + self.row_buttons:
+            widget.bind('<MouseWheel>', self._on_mousewheel)
+            widget.bind('<Button-4>', lambda e: self._scroll_to(self.top - 3))
+            widget.bind('<Button-5>', lambda e: self._scroll_to(self.top + 3))
+
+        self.window.withdraw()
+
+    def open(self, selected=()):
+        """Show the dialog with the given symptoms pre-selected"""
+        self.selected = {self.index.ids[s] for s in selected if s in self.index.ids}
+        self.query.set('')
+        self._apply_filter()
+        self.window.deiconify()
+        self.window.lift()
+        self.search_entry.focus_set()
+
+    def close(self):
+        self.window.withdraw()
+
+    def save(self):
+        """Hand the selection to on_save and hide the dialog if it was accepted"""
+        chosen = [self.index.symptoms[i] for i in sorted(self.selected)]
+        if not chosen:
+            return messagebox.showwarning("No Selection", "Please select at least one symptom!", parent=self.window)
+        if self.on_save(chosen) is not False:
+            self.close()
+
+    def _apply_filter(self):
+        self.filtered = self.index.search(self.query.get())
+        self.count_label.config(text=f"{len(self.filtered)} of {len(self.index.symptoms)} symptoms")
+        self._scroll_to(0)
+
+    def _scroll_to(self, top):
+        self.top = max(0, min(top, len(self.filtered) - self.visible_rows))
+        self._render()
+
+    def _render(self):
+        """Bind the visible rows to the symptoms at the current scroll position"""
+        for row, (var, button) in enumerate(zip(self.row_vars, self.row_buttons)):
+            position = self.top + row
+            if position < len(self.filtered):
+                symptom_id = self.filtered[position]
+                button.config(text=self.index.labels[symptom_id], state=tk.NORMAL)
+                var.set(symptom_id in self.selected)
+            else:
+                button.config(text='', state=tk.DISABLED)
+                var.set(False)
+
+        total = len(self.filtered)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _toggle(self, row):
+        position = self.top + row
+        if position >= len(self.filtered):
+            return
+        symptom_id = self.filtered[position]
+        if symptom_id in self.selected:
+            self.selected.discard(symptom_id)
+        else:
+            self.selected.add(symptom_id)
+        self.row_vars[row].set(symptom_id in self.selected)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self._scroll_to(int(float(amount) * len(self.filtered)))
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self._scroll_to(self.top + int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        self._scroll_to(self.top - (3 if event.delta > 0 else -3))
@@ -0,0 +1,41 @@
+from data_transfer import export_table, import_table
+from database import HealthDatabase
+
+ROWS = [
+    (1, '2024-01-01 10:00', '["fever"]', 'Flu', 0.5, ''),
+    (2, '2024-01-02 10:00', '["cough"]', 'Common Cold', 0.4, '2024-01-02 10:00:00'),
+]
+
+def make_database(path, rows=()):
+    database = HealthDatabase(str(path))
+    with database.connection() as conn:
+        conn.executemany('INSERT INTO diagnoses (id, date, symptoms, diagnosis, confidence, created_at) '
+                         'VALUES (?, ?, ?, ?, ?, ?)', rows)
+    return database
+
+def fetch(database):
+    return database.connection().execute(
+        'SELECT id, date, symptoms, diagnosis, confidence, created_at FROM diagnoses ORDER BY id'
+    ).fetchall()
+
+def test_jsonl_keeps_empty_strings(tmp_path):
+    source = make_database(tmp_path / 'source.db', ROWS)
+    target = make_database(tmp_path / 'target.db')
+    try:
+        export_table(source, 'diagnoses', str(tmp_path / 'diagnoses.jsonl'))
+        assert import_table(target, 'diagnoses', str(tmp_path / 'diagnoses.jsonl')) == 2
+        assert fetch(target) == ROWS
+    finally:
+        source.close()
+        target.close()
+
+def test_import_counts_only_inserted_rows(tmp_path):
+    source = make_database(tmp_path / 'source.db', ROWS)
+    target = make_database(tmp_path / 'target.db', ROWS[:1])
+    try:
+        export_table(source, 'diagnoses', str(tmp_path / 'diagnoses.csv'))
+        assert import_table(target, 'diagnoses', str(tmp_path / 'diagnoses.csv')) == 1
+        assert len(fetch(target)) == 2
+    finally:
+        source.close()
+        target.close()
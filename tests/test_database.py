@@ -0,0 +1,16 @@
+import threading
+
+from database import HealthDatabase
+
+def test_connection_closed_when_its_thread_exits(tmp_path):
+    database = HealthDatabase(str(tmp_path / 'health.db'))
+    try:
+        for _ in range(20):
+            thread = threading.Thread(target=database.get_database_stats)
+            thread.start()
+            thread.join()
+        # Only the main thread's connection is still open
+        assert len(database.connections._connections) == 1
+    finally:
+        database.close()
+    assert not database.connections._connections
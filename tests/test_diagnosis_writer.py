@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from database import HealthDatabase
+from diagnosis_writer import DiagnosisWriter
+
+@pytest.fixture
+def database(tmp_path):
+    database = HealthDatabase(str(tmp_path / 'writer.db'))
+    yield database
+    database.close()
+
+def count(database):
+    return database.connection().execute('SELECT COUNT(*) FROM diagnoses').fetchone()[0]
+
+def test_flush_writes_everything_submitted(database):
+    writer = DiagnosisWriter(database, flush_interval=60)
+    try:
+        for i in range(25):
+            assert writer.submit(['fever'], 'Flu', 0.5)
+            assert writer.flush()
+            assert writer.backlog == 0
+            assert count(database) == i + 1
+    finally:
+        writer.close()
+
+def test_close_flushes_remaining_rows(database):
+    writer = DiagnosisWriter(database, flush_interval=60)
+    for _ in range(1200):
+        writer.submit(['cough'], 'Common Cold', 0.4)
+    assert writer.close()
+    assert count(database) == 1200
+    assert writer.written == 1200
+    with pytest.raises(RuntimeError):
+        writer.submit(['cough'], 'Common Cold', 0.4)
+
+def test_submit_rejects_missing_diagnosis(database):
+    with DiagnosisWriter(database, flush_interval=60) as writer:
+        with pytest.raises(ValueError):
+            writer.submit(['fever'], None, 0.5)
+
+def test_unwritable_row_does_not_block_later_rows(database):
+    writer = DiagnosisWriter(database, flush_interval=60)
+    bad = ('2024-01-01 00:00', '[]', None, 0.5, '2024-01-01 00:00:00')
+    with writer._lock:
+        writer._add_pending(bad)
+    for _ in range(5):
+        writer.submit(['fever'], 'Flu', 0.5)
+    assert writer.flush()
+    assert writer.close()
+    assert count(database) == 5
+    assert writer.dead_letters == [bad]
+
+def test_burst_is_written_without_waiting_between_batches(database):
+    writer = DiagnosisWriter(database, batch_size=500, flush_interval=60)
+    try:
+        for _ in range(10000):
+            assert writer.submit(['fever'], 'Flu', 0.5)
+        deadline = time.monotonic() + 2.0
+        # Full batches are written straight away; only the last partial one waits for flush_interval
+        while writer.written < 10000 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert writer.written == 10000
+    finally:
+        writer.close()
@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip('sklearn')
+
+from diagnostic_engine import DiagnosticEngine
+from model_store import ModelStore
+
+@pytest.fixture(scope='module')
+def engine(tmp_path_factory):
+    return DiagnosticEngine(model_store=ModelStore(str(tmp_path_factory.mktemp('model'))))
+
+class SwappingClassifier:
+    """Stands in for the model and swaps in a new one while it is scoring"""
+
+    def __init__(self, engine, replacement):
+        self.engine = engine
+        self.replacement = replacement
+        self.classes_ = replacement.classes_
+
+    def predict_proba(self, features):
+        self.engine.swap_model(self.replacement, 'new')
+        return self.replacement.predict_proba(features)
+
+def test_result_from_swapped_out_model_is_not_cached(engine):
+    original = engine.clf
+    symptoms = ['fever', 'cough']
+    engine.swap_model(SwappingClassifier(engine, original), 'old')
+    engine.analyze_symptoms(symptoms)
+    assert engine.cache_stats()['size'] == 0
+    engine.swap_model(SwappingClassifier(engine, original), 'old')
+    engine.analyze_batch([symptoms, ['headache']])
+    assert engine.cache_stats()['size'] == 0
+    engine.analyze_symptoms(symptoms)
+    assert engine.cache_stats()['size'] == 1
@@ -0,0 +1,31 @@
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+from tip_renderer import TipPageRenderer
+
+TIPS = ['Drink water', 'Sleep <8h>']
+
+def test_concurrent_renders_of_one_page(tmp_path):
+    renderer = TipPageRenderer(cache_dir=str(tmp_path / 'cache'))
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        for _ in range(30):
+            paths = list(pool.map(lambda _: renderer.render_to_file(TIPS), range(3)))
+            assert len(set(paths)) == 1
+    assert os.listdir(tmp_path / 'cache') == [os.path.basename(paths[0])]
+    assert stat.S_IMODE(os.stat(tmp_path / 'cache').st_mode) == 0o700
+    with open(paths[0], encoding='utf-8') as f:
+        assert 'Sleep &lt;8h&gt;' in f.read()
+
+def test_symlinked_cache_dir_is_not_used(tmp_path):
+    target = tmp_path / 'elsewhere'
+    target.mkdir()
+    link = tmp_path / 'cache'
+    link.symlink_to(target)
+    renderer = TipPageRenderer(cache_dir=str(link))
+    path = renderer.render_to_file(TIPS)
+    try:
+        assert os.path.dirname(path) != str(link)
+        assert os.listdir(target) == []
+    finally:
+        os.remove(path)
@@ -0,0 +1,34 @@
+import pytest
+
+from database import HealthDatabase
+
+TIPS = [
+    ('disease', 'Heart tip', 'heart'),
+    ('disease', 'Infection tip', 'infection'),
+    ('disease', 'Anx', 'anxiety'),
+    ('disease', 'Flu tip', 'flu'),
+    ('general', 'Common sense tip about heart health', None),
+]
+
+@pytest.fixture
+def database(tmp_path):
+    database = HealthDatabase(str(tmp_path / 'tips.db'))
+    with database.connection() as conn:
+        conn.execute('DELETE FROM health_tips')
+        conn.executemany('INSERT INTO health_tips (category, tip_text, condition_related) VALUES (?, ?, ?)', TIPS)
+    database.tip_index._available = None
+    yield database
+    database.close()
+
+@pytest.mark.parametrize('condition, expected', [
+    ('heart_disease', ['Heart tip']),
+    ('urinary_tract_infection', ['Infection tip']),
+    ('anxiety_disorder', ['Anx']),
+    ('Flu', ['Flu tip']),
+    ('common_cold', []),
+])
+def test_fts_and_like_search_agree(database, condition, expected):
+    if not database.tip_index.is_available():
+        pytest.skip("SQLite built without FTS5")
+    assert database._search_tips(condition) == expected
+    assert database._search_tips_like(condition) == expected
@@ -0,0 +1,72 @@
+import re
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Broad condition families searched when nothing matches the condition itself
+FALLBACK_KEYWORDS = ('uti', 'infection', 'arthritis', 'diabetes', 'anxiety', 'depression', 'hypertension', 'heart')
+
+def normalize_condition(condition):
+    """Split a condition name into lowercase word tokens ('Urinary Tract_Infection' -> [...])"""
+    return _TOKEN_RE.findall(str(condition).lower())
+
+def fallback_keyword(condition_normalized):
+    """First FALLBACK_KEYWORDS entry contained in a normalized condition name, or None"""
+    for word in FALLBACK_KEYWORDS:
+        if word in condition_normalized:
+            return word
+    return None
+
+class TipIndex:
+    """Ranked full-text lookup of health tips by condition"""
+
+    # bm25 column weights: condition_related matches count far more than tip_text matches
+    CONDITION_WEIGHT = 10.0
+    TEXT_WEIGHT = 1.0
+
+    def __init__(self, database):
+        self.database = database
+        self._available = None
+
+    def is_available(self):
+        """True when the FTS5 tip index exists in the database"""
+        if self._available is None:
+            row = self.database.connection().execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'health_tips_fts'"
+            ).fetchone()
+            self._available = row is not None
+        return self._available
+
+    def search(self, condition, limit=None):
+        """Return tip texts for a condition, best matches first
+
+        Tips whose condition contains the whole condition phrase come first;
+        if there are none, tips whose condition contains every one of its
+        words in any order, and failing that tips for the condition's family
+        in FALLBACK_KEYWORDS ('heart_disease' -> 'heart'), as the LIKE
+        fallback does. Only the condition column is searched: a general tip
+        that happens to mention a word like "common" or "acid" isn't returned.
+        """
+        tokens = normalize_condition(condition)
+        if not tokens:
+            return []
+
+        phrase = '"' + ' '.join(tokens) + '"'
+        results = self._query(f'condition_related : {phrase}', limit)
+        if not results:
+            all_tokens = ' AND '.join(f'"{token}"' for token in tokens)
+            results = self._query(f'condition_related : ({all_tokens})', limit)
+        if not results:
+            keyword = fallback_keyword('_'.join(tokens))
+            if keyword:
+                results = self._query(f'condition_related : "{keyword}"*', limit)
+        return results
+
+    def _query(self, match, limit):
+        """Run a MATCH query ranked by weighted bm25"""
+        rows = self.database.connection().execute('''
+            SELECT tip_text FROM health_tips_fts
+            WHERE health_tips_fts MATCH ?
+            ORDER BY bm25(health_tips_fts, ?, ?)
+            LIMIT ?
+        ''', (match, self.CONDITION_WEIGHT, self.TEXT_WEIGHT, -1 if limit is None else limit))
+        return [row[0] for row in rows]
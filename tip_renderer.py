@@ -0,0 +1,144 @@
+import hashlib
+import html
+import io
+import os
+import stat
+import tempfile
+import time
+
+PAGE_HEADER = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <title>{title}</title>
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f0f8ff; }}
+                h1 {{ color: #2c3e50; text-align: center; }}
+                .tip {{ background: white; padding: 15px; margin: 10px 0; border-radius: 8px;
+                        box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
+                .tip-number {{ color: #3498db; font-weight: bold; }}
+                .personalized {{ border-left: 4px solid #e74c3c; }}
+                .general {{ border-left: 4px solid #3498db; }}
+            </style>
+        </head>
+        <body>
+            <h1>{title}</h1>
+        """
+
+TIP_ROW = '<div class="tip {tip_class}"><span class="tip-number">{number}.</span> {tip}</div>\n'
+
+PAGE_FOOTER = """
+            <div style="text-align: center; margin-top: 30px; color: #7f8c8d;">
+                <p>Remember: These are general tips. Always consult healthcare professionals for personalized advice!</p>
+            </div>
+        </body>
+        </html>
+        """
+
+# Bump when the templates change so cached pages from older layouts aren't reused
+TEMPLATE_VERSION = 1
+
+class TipPageRenderer:
+    """Render tips pages into a stream, an in-memory string or a cached file
+
+    Page files live in a private per-user directory and are named by a hash
+    of their content, so showing the same tips twice writes the file once.
+    The oldest files are removed once there are more than max_files, or when
+    they are older than max_age seconds.
+    """
+
+    def __init__(self, cache_dir=None, max_files=64, max_age=7 * 24 * 3600):
+        user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), f"health_assistant_tips-{user}")
+        self.max_files = max_files
+        self.max_age = max_age
+
+    def render_to(self, out, tips, title="Health Tips"):
+        """Write the page to any object with a write() method"""
+        title = html.escape(title)
+        # Every tip on a page gets the same style, so pick it once
+        row = TIP_ROW.replace('{tip_class}', "personalized" if "Based on" in title else "general").format
+        write = out.write
+        write(PAGE_HEADER.format(title=title))
+        for number, tip in enumerate(tips, 1):
+            write(row(number=number, tip=html.escape(tip)))
+        write(PAGE_FOOTER)
+
+    def render(self, tips, title="Health Tips"):
+        """Return the page as a string (for HTTP responses and headless use)"""
+        out = io.StringIO()
+        self.render_to(out, tips, title)
+        return out.getvalue()
+
+    def page_path(self, tips, title="Health Tips"):
+        """Cache file path for a page; identical tips and title map to the same file"""
+        digest = hashlib.sha256()
+        digest.update(f"{TEMPLATE_VERSION}\0{title}".encode('utf-8'))
+        for tip in tips:
+            digest.update(b'\0' + tip.encode('utf-8'))
+        return os.path.join(self.cache_dir, f"tips-{digest.hexdigest()[:32]}.html")
+
+    def render_to_file(self, tips, title="Health Tips"):
+        """Return the path of the cached page, writing it only if it doesn't exist yet"""
+        if not self._check_cache_dir():
+            # Don't trust a cache directory someone else controls: write a private one-off page
+            fd, path = tempfile.mkstemp(suffix='.html')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                self.render_to(f, tips, title)
+            return path
+
+        path = self.page_path(tips, title)
+        if os.path.exists(path):
+            os.utime(path)  # mark as recently used so eviction keeps it
+            return path
+
+        # A unique temp file per writer, so threads rendering the same page don't collide
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix='page-', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                self.render_to(f, tips, title)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        self.evict()
+        return path
+
+    def _check_cache_dir(self):
+        """Create the cache directory as 0700; False if it exists but isn't a private directory of ours"""
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        info = os.lstat(self.cache_dir)
+        if not stat.S_ISDIR(info.st_mode):
+            print(f"Tips page cache {self.cache_dir} is not a directory; not using it")
+            return False
+        if hasattr(os, 'getuid'):
+            if info.st_uid != os.getuid():
+                print(f"Tips page cache {self.cache_dir} belongs to another user; not using it")
+                return False
+            if stat.S_IMODE(info.st_mode) & 0o077:
+                os.chmod(self.cache_dir, 0o700)
+        return True
+
+    def evict(self):
+        """Remove expired pages and the least recently used ones beyond max_files"""
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir)
+                       if entry.name.startswith('tips-') and entry.name.endswith('.html')]
+        except FileNotFoundError:
+            return 0
+
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for position, entry in enumerate(entries):
+            if position >= self.max_files or entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError as e:
+                    print(f"Could not remove cached tips page: {e}")
+        return removed
@@ -0,0 +1,140 @@
+import copy
+import json
+import threading
+
+from model_store import ModelStore
+
+class HistoryTrainer:
+    """Incrementally train a diagnosis model on the cases saved in the diagnoses table
+
+    Uses a Bernoulli naive Bayes model, which fits binary symptom features
+    and supports partial_fit. Each update reads only rows newer than the last
+    one trained on, so its cost grows with new data rather than total
+    history. It is seeded with the engine's synthetic samples so that every
+    illness is known from the start. Each case is labelled with the
+    diagnosis that was saved for it.
+    """
+
+    def __init__(self, engine, database, model_store=None, chunk_size=5000):
+        import sklearn
+        if engine.mode != 'model':
+            raise ValueError("HistoryTrainer needs a DiagnosticEngine in 'model' mode")
+        self.engine = engine
+        self.database = database
+        self.chunk_size = chunk_size
+        self.model_store = model_store or ModelStore(engine.model_store.directory, name="history_model")
+        self.classes = sorted(engine.illnesses)
+        # Saved diagnoses use display names ("Common Cold"); map them back to class labels
+        self.labels = {name.replace('_', ' ').title(): name for name in self.classes}
+        self.base_hash = ModelStore.content_hash(
+            *engine.knowledge_base.training_inputs(), 'history', database.db_path, sklearn.__version__
+        )
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.clf, self.last_id = self._load_or_seed()
+
+    @property
+    def model_hash(self):
+        """Identifies the current model: knowledge base plus the last case trained on"""
+        return f"{self.base_hash}:{self.last_id}"
+
+    def _load_or_seed(self):
+        artifact = self.model_store.load(self.base_hash)
+        if artifact:
+            return artifact['clf'], artifact['last_id']
+
+        from sklearn.naive_bayes import BernoulliNB
+        clf = BernoulliNB()
+        X, y = self.engine.synthetic_training_data()
+        clf.partial_fit(X, y, classes=self.classes)
+        return clf, 0
+
+    def iter_labelled_chunks(self, after_id):
+        """Yield (features, labels, last_id) for saved cases newer than after_id, a chunk at a time"""
+        from scipy.sparse import csr_matrix
+        index = self.engine.symptom_index
+        while True:
+            rows = self.database.connection().execute('''
+                SELECT id, symptoms, diagnosis FROM diagnoses
+                WHERE id > ? ORDER BY id LIMIT ?
+            ''', (after_id, self.chunk_size)).fetchall()
+            if not rows:
+                return
+            after_id = rows[-1][0]
+
+            indptr, indices, labels = [0], [], []
+            for _, symptoms_raw, diagnosis in rows:
+                label = self.labels.get(diagnosis)
+                try:
+                    symptoms = json.loads(symptoms_raw)
+                except (TypeError, ValueError):
+                    continue
+                if label is None or not isinstance(symptoms, list):
+                    continue
+                indices.extend(sorted({index[s] for s in symptoms if s in index}))
+                indptr.append(len(indices))
+                labels.append(label)
+
+            if labels:
+                data = [1.0] * len(indices)
+                features = csr_matrix((data, indices, indptr), shape=(len(labels), len(index)))
+                yield features, labels, after_id
+            else:
+                yield None, [], after_id
+
+    def update(self):
+        """Train on new cases and swap the result into the engine; returns the number of cases used"""
+        with self._lock:
+            # Train a copy so the engine keeps serving the current model meanwhile
+            candidate = copy.deepcopy(self.clf)
+            last_id, used = self.last_id, 0
+            for features, labels, chunk_last_id in self.iter_labelled_chunks(self.last_id):
+                if labels:
+                    candidate.partial_fit(features, labels)
+                    used += len(labels)
+                last_id = chunk_last_id
+
+            if last_id == self.last_id:
+                return 0
+            self.clf, self.last_id = candidate, last_id
+            self.model_store.save(self.base_hash, clf=candidate, last_id=last_id)
+            self.engine.swap_model(candidate, self.model_hash)
+            return used
+
+    def activate(self):
+        """Serve the trainer's current model from the engine"""
+        self.engine.swap_model(self.clf, self.model_hash)
+
+    def update_async(self):
+        """Run one update on a background thread"""
+        thread = threading.Thread(target=self._safe_update, name="HistoryTrainer", daemon=True)
+        thread.start()
+        return thread
+
+    def start(self, interval=3600.0):
+        """Retrain in the background every interval seconds until stop() is called"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                self._safe_update()
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, name="HistoryTrainer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _safe_update(self):
+        try:
+            return self.update()
+        except Exception as e:
+            print(f"Error retraining from history: {e}")
+            return 0
@@ -0,0 +1,119 @@
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from diagnostic_engine import DiagnosticEngine
+from model_store import ModelStore
+
+# Engine used inside worker processes. With the fork start method it is
+# inherited from the parent after training; otherwise each worker loads
+# the stored model artifact once in _init_worker.
+_worker_engine = None
+
+def _init_worker(model_store):
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = DiagnosticEngine(model_store)
+
+def _score_chunk(symptom_sets, with_reports):
+    results = _worker_engine.analyze_batch(symptom_sets)
+    if with_reports:
+        return [(diagnoses, _worker_engine.format_diagnosis_report(diagnoses, symptoms))
+                for diagnoses, symptoms in zip(results, symptom_sets)]
+    return results
+
+class DiagnosisWorkerPool:
+    """Score large numbers of symptom sets across several processes"""
+
+    def __init__(self, workers=None, chunk_size=1000, model_store=None):
+        """Train or load the model once, then start worker processes that share it"""
+        global _worker_engine
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.model_store = model_store or ModelStore()
+
+        # Makes sure the artifact exists on disk before any worker looks for it
+        engine = DiagnosticEngine(self.model_store)
+        if 'fork' in multiprocessing.get_all_start_methods():
+            _worker_engine = engine
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing.get_context()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                            initializer=_init_worker, initargs=(self.model_store,))
+
+    def score(self, symptom_sets, with_reports=False):
+        """Return diagnoses (and optionally reports) for every symptom set, in input order"""
+        return list(self.imap(symptom_sets, with_reports))
+
+    def imap(self, symptom_sets, with_reports=False, max_pending=None):
+        """Yield results in input order while keeping a bounded number of chunks in flight"""
+        max_pending = max_pending or self.workers * 2
+        pending = []
+        for chunk in _chunks(symptom_sets, self.chunk_size):
+            pending.append(self.executor.submit(_score_chunk, chunk, with_reports))
+            if len(pending) >= max_pending:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def random_symptom_sets(count, vocabulary, max_symptoms=5, seed=0):
+    """Generate a reproducible synthetic workload of symptom sets"""
+    rng = random.Random(seed)
+    return [rng.sample(vocabulary, rng.randint(1, max_symptoms)) for _ in range(count)]
+
+def benchmark(cases=200000, worker_counts=None, chunk_size=2000, with_reports=True):
+    """Measure scoring throughput for increasing numbers of worker processes"""
+    engine = DiagnosticEngine()
+    workload = random_symptom_sets(cases, engine.all_symptoms)
+    worker_counts = worker_counts or sorted({1, 2, 4, os.cpu_count() or 1})
+
+    start = time.perf_counter()
+    for symptoms in workload:
+        diagnoses = engine.analyze_symptoms(symptoms)
+        if with_reports:
+            engine.format_diagnosis_report(diagnoses, symptoms)
+    baseline = cases / (time.perf_counter() - start)
+    print(f"single process, per-case: {baseline:,.0f} cases/s")
+
+    results = {'per_case': baseline}
+    for workers in worker_counts:
+        with DiagnosisWorkerPool(workers, chunk_size) as pool:
+            pool.score(workload[:chunk_size * workers])  # warm up workers
+            start = time.perf_counter()
+            pool.score(workload, with_reports)
+            rate = cases / (time.perf_counter() - start)
+        results[workers] = rate
+        print(f"{workers} worker(s): {rate:,.0f} cases/s ({rate / baseline:.1f}x)")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Diagnosis worker pool throughput benchmark")
+    parser.add_argument('--cases', type=int, default=200000)
+    parser.add_argument('--workers', type=int, nargs='*')
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    parser.add_argument('--no-reports', action='store_true')
+    args = parser.parse_args()
+    benchmark(args.cases, args.workers, args.chunk_size, not args.no_reports)